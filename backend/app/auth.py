@@ -1,26 +1,19 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from .auth_cache import token_cache, user_cache
 from .config import settings
-from .database import get_db
-from . import models
+from .database import get_async_db
+from . import models, schemas
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer(auto_error=False)
 
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
-
-
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
-
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES))
@@ -28,25 +21,66 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
 
-def get_current_user(
-    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
-    db: Session = Depends(get_db),
-) -> Optional[models.User]:
-    if not credentials:
-        return None
+class Principal:
+    """Who is calling: the signed token's user, known to still exist; enough for routes that only compare ids."""
+    __slots__ = ("id",)
+
+    def __init__(self, id: str):
+        self.id = id
+
+
+def token_user_id(token: str) -> Optional[str]:
+    user_id = token_cache.get(token)
+    if user_id is not None:
+        return user_id
     try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        user_id: str = payload.get("sub")
-        if not user_id:
-            return None
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    user_id = payload.get("sub")
+    if not user_id:
+        return None
+    token_cache.put(token, user_id, ttl=payload["exp"] - time.time() if "exp" in payload else None)
+    return user_id
+
 
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def get_current_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> Optional[schemas.UserOut]:
+    if not credentials:
+        return None
+    user_id = token_user_id(credentials.credentials)
+    if not user_id:
+        return None
+    user = user_cache.get(user_id)
+    if user is None:
+        # A valid token can outlive its user; the caller is then anonymous
+        row = await db.get(models.User, user_id)
+        if row is None:
+            return None
+        user = schemas.UserOut.model_validate(row)
+        user_cache.put(user_id, user)
     return user
 
 
-def require_user(user: Optional[models.User] = Depends(get_current_user)) -> models.User:
+def require_user(user: Optional[schemas.UserOut] = Depends(get_current_user)) -> schemas.UserOut:
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
     return user
+
+
+def get_current_principal(user: Optional[schemas.UserOut] = Depends(get_current_user)) -> Optional[Principal]:
+    return Principal(user.id) if user else None
+
+
+def require_principal(principal: Optional[Principal] = Depends(get_current_principal)) -> Principal:
+    if not principal:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
+    return principal
+
+
+@event.listens_for(models.User, "after_update")
+@event.listens_for(models.User, "after_delete")
+def _forget_user(mapper, connection, target: models.User):
+    user_cache.invalidate(target.id)
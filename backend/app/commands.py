@@ -0,0 +1,80 @@
+"""Maintenance commands; the schema must be current (`python -m app.migrate`) first.
+
+    cd backend
+    python -m app.commands repair-counters
+    python -m app.commands compact-items [--older-than-days N]
+"""
+import argparse
+from sqlalchemy import and_, exists, func, or_, select, update
+from sqlalchemy.orm import Session
+from . import models
+from .compaction import compact_deleted_items
+from .config import settings
+from .database import SessionLocal
+
+
+def repair_counters(db: Session) -> dict[str, int]:
+    """Recompute the denormalized item / wishlist counters from source rows; returns how many rows drifted.
+
+    Migration 0004 adds the counter columns and fills them; this only repairs drift afterwards.
+    """
+    Item, Wishlist = models.Item, models.Wishlist
+    total = (
+        select(func.coalesce(func.sum(models.Contribution.amount), 0))
+        .where(models.Contribution.item_id == Item.id)
+        .scalar_subquery()
+    )
+    count = select(func.count()).where(models.Contribution.item_id == Item.id).scalar_subquery()
+    reserved = exists().where(models.Reservation.item_id == Item.id, models.Reservation.is_cancelled == False)
+    items = db.execute(
+        update(Item)
+        .where(or_(
+            Item.contributed_total != total,
+            Item.contributors_count != count,
+            Item.is_reserved != reserved,
+        ))
+        .values(contributed_total=total, contributors_count=count, is_reserved=reserved)
+        .execution_options(synchronize_session=False)
+    )
+
+    active = (
+        select(func.count())
+        .where(and_(Item.wishlist_id == Wishlist.id, Item.is_deleted == False))
+        .scalar_subquery()
+    )
+    wishlists = db.execute(
+        update(Wishlist)
+        .where(Wishlist.active_item_count != active)
+        .values(active_item_count=active)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return {"items": items.rowcount, "wishlists": wishlists.rowcount}
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("repair-counters", help="recompute reservation/contribution/item counters")
+    compact = commands.add_parser("compact-items", help="move long soft-deleted items into the archive tables")
+    compact.add_argument(
+        "--older-than-days", type=float, default=settings.ITEM_ARCHIVE_AFTER / 86400,
+        help="archive items deleted longer ago than this (default: ITEM_ARCHIVE_AFTER)",
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.command == "repair-counters":
+            fixed = repair_counters(db)
+            print(f"repaired {fixed['items']} items, {fixed['wishlists']} wishlists")
+        elif args.command == "compact-items":
+            moved = compact_deleted_items(db, args.older_than_days * 86400, settings.COMPACTION_BATCH_SIZE)
+            print(f"archived {moved['items']} items, {moved['reservations']} reservations, "
+                  f"{moved['contributions']} contributions")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
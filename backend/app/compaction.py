@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import DateTime, delete, func, insert, literal, select, update
+from sqlalchemy.orm import Session
+from . import models
+from .config import settings
+from .database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ITEM_COLUMNS = [
+    "id", "wishlist_id", "name", "url", "price", "image_url", "description", "priority", "is_group_gift",
+    "target_amount", "deleted_at", "created_at", "contributed_total", "contributors_count", "updated_revision",
+]
+RESERVATION_COLUMNS = ["id", "item_id", "reserver_name", "reserver_email", "reserver_user_id", "is_cancelled", "created_at"]
+CONTRIBUTION_COLUMNS = ["id", "item_id", "contributor_name", "contributor_email", "contributor_user_id", "amount", "created_at"]
+
+
+def copy_rows(db: Session, source, target, columns: list[str], where, **extra):
+    """INSERT INTO target (...) SELECT ... FROM source WHERE ..., plus constant `extra` columns."""
+    values = [getattr(source, c) for c in columns] + [literal(v, DateTime) for v in extra.values()]
+    return db.execute(insert(target).from_select(columns + list(extra), select(*values).where(where)))
+
+
+def compact_batch(db: Session, cutoff: datetime, limit: int) -> dict[str, int]:
+    """Move up to `limit` items soft-deleted before `cutoff`, with their dependent rows, into the archive."""
+    Item, Wishlist = models.Item, models.Wishlist
+    candidates = db.execute(
+        select(Item.id, Item.wishlist_id)
+        .where(Item.is_deleted == True, Item.deleted_at < cutoff)
+        .order_by(Item.deleted_at)
+        .limit(limit)
+    ).all()
+    if not candidates:
+        return {"items": 0, "reservations": 0, "contributions": 0}
+    ids = [item_id for item_id, _ in candidates]
+
+    # Wishlist rows first, in a fixed order, like every write path; holding them keeps the
+    # item writers of these lists out until the move is committed
+    db.execute(
+        select(Wishlist.id)
+        .where(Wishlist.id.in_({wishlist_id for _, wishlist_id in candidates}))
+        .order_by(Wishlist.id)
+        .with_for_update()
+    ).all()
+    for wishlist_id, revision in db.execute(
+        select(Item.wishlist_id, func.max(Item.updated_revision)).where(Item.id.in_(ids)).group_by(Item.wishlist_id)
+    ):
+        db.execute(
+            update(Wishlist)
+            .where(Wishlist.id == wishlist_id, Wishlist.compacted_revision < revision)
+            .values(compacted_revision=revision)
+        )
+
+    copy_rows(db, Item, models.ArchivedItem, ITEM_COLUMNS, Item.id.in_(ids), archived_at=datetime.utcnow())
+    reservations = copy_rows(
+        db, models.Reservation, models.ArchivedReservation, RESERVATION_COLUMNS, models.Reservation.item_id.in_(ids)
+    )
+    contributions = copy_rows(
+        db, models.Contribution, models.ArchivedContribution, CONTRIBUTION_COLUMNS, models.Contribution.item_id.in_(ids)
+    )
+    db.execute(delete(models.ItemRefreshState).where(models.ItemRefreshState.item_id.in_(ids)))
+    db.execute(delete(models.Reservation).where(models.Reservation.item_id.in_(ids)))
+    db.execute(delete(models.Contribution).where(models.Contribution.item_id.in_(ids)))
+    db.execute(delete(Item).where(Item.id.in_(ids)))
+    db.commit()
+    return {"items": len(ids), "reservations": reservations.rowcount, "contributions": contributions.rowcount}
+
+
+def compact_deleted_items(db: Session, older_than: float, batch_size: int) -> dict[str, int]:
+    """Archive every item soft-deleted more than `older_than` seconds ago, one transaction per batch."""
+    cutoff = datetime.utcnow() - timedelta(seconds=older_than)
+    totals = {"items": 0, "reservations": 0, "contributions": 0}
+    while True:
+        moved = compact_batch(db, cutoff, batch_size)
+        for key, n in moved.items():
+            totals[key] += n
+        if moved["items"] < batch_size:
+            return totals
+
+
+def run_compaction() -> dict[str, int]:
+    db = SessionLocal()
+    try:
+        return compact_deleted_items(db, settings.ITEM_ARCHIVE_AFTER, settings.COMPACTION_BATCH_SIZE)
+    finally:
+        db.close()
+
+
+class ItemCompactor:
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self.runs = 0
+        self.failures = 0
+        self.archived = {"items": 0, "reservations": 0, "contributions": 0}
+
+    def start(self):
+        if settings.COMPACTION_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.COMPACTION_INTERVAL)
+            try:
+                moved = await asyncio.to_thread(run_compaction)
+            except Exception:
+                self.failures += 1
+                logger.exception("Item compaction failed")
+                continue
+            self.runs += 1
+            for key, n in moved.items():
+                self.archived[key] += n
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": settings.COMPACTION_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "runs": self.runs,
+            "failures": self.failures,
+            "archived": dict(self.archived),
+        }
+
+
+item_compactor = ItemCompactor()
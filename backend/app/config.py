@@ -7,6 +7,90 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 10080  # 7 days
     FRONTEND_URL: str = "http://localhost:3000"
+    # GET /internal/stats is only mounted when set, and wants it in the X-Internal-Token header
+    INTERNAL_STATS_TOKEN: str = ""
+
+    # Decoded bearer tokens and user records kept in memory per process
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL: float = 60.0  # seconds; also how long another worker's user changes can go unseen
+
+    # Password hashing, on its own thread pool
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_LIMIT: int = 16  # hashes waiting beyond this are refused with 503
+
+    # Database connection pools. Each process opens at most DB_POOL_SIZE + DB_MAX_OVERFLOW sync
+    # connections plus DB_ASYNC_POOL_SIZE + DB_ASYNC_MAX_OVERFLOW async ones (20 by default),
+    # and two more for the postgres realtime bus
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 5
+    DB_ASYNC_POOL_SIZE: int = 5
+    DB_ASYNC_MAX_OVERFLOW: int = 5
+    DB_POOL_TIMEOUT: float = 10.0  # seconds to wait for a free connection before failing
+    DB_POOL_RECYCLE: int = 1800  # replace connections older than this, before the server or a proxy drops them
+    DB_POOL_PRE_PING: bool = True
+
+    # Opt-in keyset pagination of wishlists and wishlist items (?limit=&cursor=)
+    PAGE_SIZE_DEFAULT: int = 50
+    PAGE_SIZE_MAX: int = 200
+
+    # POST /wishlists/{slug}/items/bulk
+    ITEM_BULK_MAX_ITEMS: int = 100
+
+    # WebSocket fan-out: events queued per socket beyond this, or a send stuck longer, drop the socket
+    WS_SEND_QUEUE_SIZE: int = 64
+    WS_SEND_TIMEOUT: float = 5.0
+
+    # Realtime events between processes: "local" (one process) or "postgres" (LISTEN/NOTIFY on DATABASE_URL)
+    REALTIME_BACKEND: str = "local"
+    REALTIME_CHANNEL: str = "wishlist_events"
+    REALTIME_OUTBOX_SIZE: int = 10000
+
+    # Rendered GET /wishlists/{slug} pages kept in memory, per slug; 0 disables
+    WISHLIST_CACHE_SIZE: int = 1024
+    WISHLIST_CACHE_TTL: float = 300.0  # seconds; bounds how long a missed cross-process invalidation lasts, 0 = no expiry
+
+    # URL scraper HTTP client
+    SCRAPER_TIMEOUT: float = 15.0
+    SCRAPER_HTTP2: bool = True
+    SCRAPER_MAX_CONNECTIONS: int = 100
+    SCRAPER_MAX_KEEPALIVE: int = 20
+    SCRAPER_KEEPALIVE_EXPIRY: float = 60.0
+    SCRAPER_PER_HOST_CONNECTIONS: int = 6
+    SCRAPER_MAX_DOWNLOADS: int = 64  # page downloads in flight at once; more wait their turn
+    SCRAPER_MAX_BYTES: int = 3 * 1024 * 1024
+    SCRAPER_PARSE_WORKERS: int = 4
+    SCRAPER_PARSE_QUEUE_LIMIT: int = 32
+    SCRAPER_MAX_SCRAPES: int = 96  # scrapes admitted at once, downloads included; more get 503
+    SCRAPE_CACHE_SIZE: int = 2048
+    SCRAPE_CACHE_TTL: float = 3600.0
+    SCRAPE_CACHE_NEGATIVE_TTL: float = 60.0
+    SCRAPE_BATCH_MAX_URLS: int = 100
+    SCRAPE_BATCH_CONCURRENCY: int = 16
+
+    # Background price refresh
+    PRICE_REFRESH_ENABLED: bool = True
+    PRICE_REFRESH_INTERVAL: float = 300.0  # seconds between scheduler ticks
+    PRICE_REFRESH_MAX_AGE: float = 86400.0  # re-scrape items checked longer ago than this
+    PRICE_REFRESH_BATCH_SIZE: int = 50
+    PRICE_REFRESH_CONCURRENCY: int = 4
+    PRICE_REFRESH_HOST_DELAY: float = 5.0  # min seconds between requests to one shop
+    PRICE_REFRESH_JITTER: float = 3.0
+
+    # Compaction of soft-deleted items into the archive tables
+    COMPACTION_ENABLED: bool = True
+    COMPACTION_INTERVAL: float = 3600.0
+    COMPACTION_BATCH_SIZE: int = 500
+    ITEM_ARCHIVE_AFTER: float = 30 * 86400.0  # seconds an item stays soft-deleted before it is archived
+
+    # Item image thumbnails
+    THUMBNAILS_ENABLED: bool = True
+    MEDIA_DIR: str = "media"
+    THUMBNAIL_WIDTHS: list[int] = [160, 320, 640]
+    THUMBNAIL_QUALITY: int = 80
+    THUMBNAIL_MAX_SOURCE_BYTES: int = 15 * 1024 * 1024
+    THUMBNAIL_MAX_PIXELS: int = 40_000_000  # larger sources are refused before they are decoded
+    THUMBNAIL_CONCURRENCY: int = 2
 
     class Config:
         env_file = ".env"
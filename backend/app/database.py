@@ -1,12 +1,54 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from .config import settings
+from .db_pool import DBPoolStats, instrumented_pool
 
-engine = create_engine(settings.DATABASE_URL)
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+
+def async_database_url(url: str):
+    """Same database as DATABASE_URL, reached through an asyncio driver."""
+    url = make_url(url)
+    backend = url.drivername.split("+")[0]
+    url = url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+    # asyncpg spells libpq's sslmode as ssl
+    if backend in ("postgresql", "postgres") and "sslmode" in url.query:
+        url = url.difference_update_query(["sslmode"]).update_query_dict({"ssl": url.query["sslmode"]})
+    return url
+
+
+def pool_options(poolclass: type[QueuePool], stats: DBPoolStats, size: int, overflow: int) -> dict:
+    return {
+        "poolclass": instrumented_pool(poolclass, stats),
+        "pool_size": size,
+        "max_overflow": overflow,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+pool_stats = DBPoolStats()
+async_pool_stats = DBPoolStats()
+
+engine = create_engine(
+    settings.DATABASE_URL, **pool_options(QueuePool, pool_stats, settings.DB_POOL_SIZE, settings.DB_MAX_OVERFLOW)
+)
+pool_stats.attach(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+async_engine = create_async_engine(
+    async_database_url(settings.DATABASE_URL),
+    **pool_options(AsyncAdaptedQueuePool, async_pool_stats, settings.DB_ASYNC_POOL_SIZE, settings.DB_ASYNC_MAX_OVERFLOW),
+)
+async_pool_stats.attach(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -14,3 +56,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
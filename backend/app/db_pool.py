@@ -0,0 +1,97 @@
+import threading
+import time
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+
+class DBPoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.engine: Engine | None = None
+        self.checkouts = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, wait: float, overflowed: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self.overflow_checkouts += overflowed
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def attach(self, engine: Engine):
+        """Hook the engine's pool events; the engine must use a pool from `instrumented_pool`."""
+        self.engine = engine
+
+        @event.listens_for(engine, "checkout")
+        def on_checkout(*_):
+            with self._lock:
+                self.in_use += 1
+                self.max_in_use = max(self.max_in_use, self.in_use)
+
+        @event.listens_for(engine, "checkin")
+        def on_checkin(*_):
+            with self._lock:
+                self.in_use -= 1
+
+        @event.listens_for(engine, "connect")
+        def on_connect(*_):
+            with self._lock:
+                self.connects += 1
+
+        @event.listens_for(engine, "invalidate")
+        def on_invalidate(*_):
+            with self._lock:
+                self.invalidations += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            checkouts = self.checkouts
+            snap = {
+                "checkouts": checkouts,
+                "in_use": self.in_use,
+                "max_in_use": self.max_in_use,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "avg_wait_ms": round(self.wait_total / checkouts * 1000, 2) if checkouts else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 2),
+            }
+        if self.engine is not None:
+            # engine.pool is swapped out by dispose(); overflow() counts up from -pool_size
+            pool = self.engine.pool
+            snap.update(size=pool.size(), idle=pool.checkedin(), overflow=max(0, pool.overflow()))
+        return snap
+
+
+def instrumented_pool(base: type[QueuePool], stats: DBPoolStats) -> type[QueuePool]:
+    """Subclass `base` so that every checkout is timed, including waits for a free slot.
+
+    Built per engine so the stats survive `Pool.recreate()`, which re-instantiates the class.
+    """
+
+    class InstrumentedPool(base):
+        def connect(self):
+            started = time.perf_counter()
+            try:
+                conn = super().connect()
+            except exc.TimeoutError:
+                stats.record_timeout()
+                raise
+            stats.record_wait(time.perf_counter() - started, self.overflow() > 0)
+            return conn
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    return InstrumentedPool
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+from .config import settings
+
+# Hashes made with another cost than BCRYPT_ROUNDS report needs_update and are redone at login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+class HashStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self.hash_time_total = 0.0
+        self.hash_time_max = 0.0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def record(self, queue_wait: float, hash_time: float):
+        with self._lock:
+            self.jobs += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_time
+            self.hash_time_max = max(self.hash_time_max, hash_time)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            jobs = self.jobs
+            return {
+                "jobs": jobs,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                "avg_hash_ms": round(self.hash_time_total / jobs * 1000, 2) if jobs else 0.0,
+                "max_hash_ms": round(self.hash_time_max * 1000, 2),
+                "avg_queue_wait_ms": round(self.queue_wait_total / jobs * 1000, 2) if jobs else 0.0,
+                "max_queue_wait_ms": round(self.queue_wait_max * 1000, 2),
+            }
+
+
+class PasswordHasher:
+    """bcrypt on its own small thread pool, so a login burst can't starve the shared threadpool.
+
+    bcrypt releases the GIL while hashing, so threads run it in parallel. At most
+    `workers + queue_limit` hashes are admitted at once; beyond that requests are shed
+    with a 503 instead of queueing for seconds.
+    """
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor: ThreadPoolExecutor | None = None
+        self._admitted = 0
+        self.stats = HashStats()
+
+    def start(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, fn, *args):
+        if self._admitted >= self.workers + self.queue_limit:
+            self.stats.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many sign-in attempts right now, try again shortly",
+                headers={"Retry-After": "1"},
+            )
+        self.start()
+        self._admitted += 1
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.stats.record(started - submitted, time.perf_counter() - started)
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, job)
+        finally:
+            self._admitted -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(pwd_context.hash, password)
+
+    async def verify(self, password: str, hashed: str) -> tuple[bool, str | None]:
+        """(matches, replacement hash when the stored one uses an outdated cost or scheme)."""
+        ok, new_hash = await self._run(pwd_context.verify_and_update, password, hashed)
+        if new_hash is not None:
+            self.stats.rehashed += 1
+        return ok, new_hash
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            "in_flight": self._admitted,
+            **self.stats.snapshot(),
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT,
+)
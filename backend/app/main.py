@@ -1,14 +1,37 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from .compaction import item_compactor
 from .config import settings
-from .database import Base, engine
-from .routers import auth, wishlists, items, reservations, contributions, scraper
+from .hashing import password_hasher
+from .routers import auth, wishlists, items, reservations, contributions, scraper, images, internal, exports
+from .price_refresh import price_refresher
+from .pubsub import bus
+from .scraping.client import scraper_client
+from .scraping.workers import parse_pool
+from .thumbnails import thumbnailer
 from .websocket_manager import manager
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="WishList API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await scraper_client.start()
+    await bus.start(manager.receive_remote, manager.resync)
+    parse_pool.start()
+    password_hasher.start()
+    price_refresher.start()
+    item_compactor.start()
+    yield
+    await item_compactor.stop()
+    await price_refresher.stop()
+    await thumbnailer.stop()
+    await bus.stop()
+    await scraper_client.close()
+    parse_pool.close()
+    password_hasher.close()
+
+
+app = FastAPI(title="WishList API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,6 +48,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "Content-Disposition"],
 )
 
 app.include_router(auth.router)
@@ -33,6 +57,10 @@ app.include_router(items.router)
 app.include_router(reservations.router)
 app.include_router(contributions.router)
 app.include_router(scraper.router)
+app.include_router(images.router)
+if settings.INTERNAL_STATS_TOKEN:
+    app.include_router(internal.router)
+app.include_router(exports.router)
 
 
 @app.get("/health")
@@ -48,4 +76,6 @@ async def websocket_endpoint(websocket: WebSocket, slug: str):
             # Keep connection alive, ignore incoming messages
             await websocket.receive_text()
     except WebSocketDisconnect:
+        pass
+    finally:
         manager.disconnect(websocket, slug)
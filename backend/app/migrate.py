@@ -0,0 +1,45 @@
+"""Bring the database schema up to date; runs before the app starts.
+
+    cd backend
+    python -m app.migrate
+"""
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from .database import engine
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# The schema create_all used to build at import time, before migrations existed
+BASELINE_REVISION = "0001"
+
+
+def alembic_config() -> Config:
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+def adopt_existing_schema(config: Config) -> str | None:
+    """Stamp a database that has the app's tables but no alembic_version; returns the revision stamped."""
+    tables = set(inspect(engine).get_table_names())
+    if "alembic_version" in tables or "wishlists" not in tables:
+        return None
+    command.stamp(config, BASELINE_REVISION)
+    return BASELINE_REVISION
+
+
+def main():
+    config = alembic_config()
+    try:
+        stamped = adopt_existing_schema(config)
+        if stamped:
+            print(f"existing schema stamped as {stamped}")
+        command.upgrade(config, "head")
+    finally:
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Boolean, Text, Integer
+from sqlalchemy import Column, String, DateTime, ForeignKey, Numeric, Boolean, Text, Integer, Index, false, true
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from .database import Base
@@ -35,20 +35,31 @@ class Wishlist(Base):
     is_public = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Denormalized, kept in step by the item routers; `python -m app.commands repair-counters` reconciles
+    active_item_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every change to the list or its items; serves as the ETag and the delta cursor
+    revision = Column(Integer, nullable=False, default=0, server_default="0")
+    # Highest revision whose removals were compacted into the archive; older deltas can't be served
+    compacted_revision = Column(Integer, nullable=False, default=0, server_default="0")
+
+    # Also the index for the user_id foreign key; matches list_wishlists' order
+    __table_args__ = (Index("ix_wishlists_user_created", user_id, created_at.desc(), id.desc()),)
 
     owner = relationship("User", back_populates="wishlists")
     items = relationship("Item", back_populates="wishlist", cascade="all, delete-orphan")
+    archived_items = relationship("ArchivedItem", cascade="all, delete-orphan")
 
 
 class Item(Base):
     __tablename__ = "items"
 
     id = Column(UUID(as_uuid=False), primary_key=True, default=gen_uuid)
-    wishlist_id = Column(UUID(as_uuid=False), ForeignKey("wishlists.id"), nullable=False)
+    wishlist_id = Column(UUID(as_uuid=False), ForeignKey("wishlists.id"), nullable=False, index=True)
     name = Column(String(300), nullable=False)
     url = Column(Text, nullable=True)
     price = Column(Numeric(12, 2), nullable=True)
     image_url = Column(Text, nullable=True)
+    image_digest = Column(String(64), nullable=True)  # sha256 of the source image, names its thumbnails
     description = Column(Text, nullable=True)
     priority = Column(Integer, default=2)  # 1=low, 2=medium, 3=high
     is_group_gift = Column(Boolean, default=False)  # allow multiple contributions
@@ -56,6 +67,29 @@ class Item(Base):
     is_deleted = Column(Boolean, default=False)
     deleted_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    # Denormalized from reservations / contributions, kept in step by their routers
+    is_reserved = Column(Boolean, nullable=False, default=False, server_default=false())
+    contributed_total = Column(Numeric(12, 2), nullable=False, default=0, server_default="0")
+    contributors_count = Column(Integer, nullable=False, default=0, server_default="0")
+    updated_revision = Column(Integer, nullable=False, default=0, server_default="0")  # wishlist revision of the last change
+
+    __table_args__ = (
+        # The public wishlist read: live items of one list in display order
+        Index(
+            "ix_items_wishlist_active_order", wishlist_id, priority.desc(), created_at, id,
+            postgresql_where=is_deleted == false(), sqlite_where=is_deleted == false(),
+        ),
+        # Compaction's scan for items removed long enough ago
+        Index(
+            "ix_items_deleted_at", deleted_at,
+            postgresql_where=is_deleted == true(), sqlite_where=is_deleted == true(),
+        ),
+        # GET /images finding the source of a thumbnail this replica doesn't have on disk
+        Index(
+            "ix_items_image_digest", image_digest,
+            postgresql_where=image_digest.isnot(None), sqlite_where=image_digest.isnot(None),
+        ),
+    )
 
     wishlist = relationship("Wishlist", back_populates="items")
     reservation = relationship("Reservation", back_populates="item", uselist=False, cascade="all, delete-orphan")
@@ -69,7 +103,7 @@ class Reservation(Base):
     item_id = Column(UUID(as_uuid=False), ForeignKey("items.id"), nullable=False, unique=True)
     reserver_name = Column(String(100), nullable=False)
     reserver_email = Column(String(255), nullable=True)
-    reserver_user_id = Column(UUID(as_uuid=False), ForeignKey("users.id"), nullable=True)
+    reserver_user_id = Column(UUID(as_uuid=False), ForeignKey("users.id"), nullable=True, index=True)
     is_cancelled = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -80,7 +114,7 @@ class Contribution(Base):
     __tablename__ = "contributions"
 
     id = Column(UUID(as_uuid=False), primary_key=True, default=gen_uuid)
-    item_id = Column(UUID(as_uuid=False), ForeignKey("items.id"), nullable=False)
+    item_id = Column(UUID(as_uuid=False), ForeignKey("items.id"), nullable=False, index=True)
     contributor_name = Column(String(100), nullable=False)
     contributor_email = Column(String(255), nullable=True)
     contributor_user_id = Column(UUID(as_uuid=False), ForeignKey("users.id"), nullable=True)
@@ -88,3 +122,65 @@ class Contribution(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
 
     item = relationship("Item", back_populates="contributions")
+
+
+# Soft-deleted items and their reservations / contributions, moved out of the hot tables by
+# `python -m app.commands compact-items` once they are older than ITEM_ARCHIVE_AFTER.
+# Kept for refund coordination; no read path of the app touches them.
+
+class ArchivedItem(Base):
+    __tablename__ = "archived_items"
+
+    id = Column(UUID(as_uuid=False), primary_key=True)
+    wishlist_id = Column(UUID(as_uuid=False), ForeignKey("wishlists.id", ondelete="CASCADE"), nullable=False, index=True)
+    name = Column(String(300), nullable=False)
+    url = Column(Text, nullable=True)
+    price = Column(Numeric(12, 2), nullable=True)
+    image_url = Column(Text, nullable=True)
+    description = Column(Text, nullable=True)
+    priority = Column(Integer)
+    is_group_gift = Column(Boolean)
+    target_amount = Column(Numeric(12, 2), nullable=True)
+    deleted_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime)
+    contributed_total = Column(Numeric(12, 2), nullable=False, default=0)
+    contributors_count = Column(Integer, nullable=False, default=0)
+    updated_revision = Column(Integer, nullable=False, default=0)
+    archived_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    reservation = relationship("ArchivedReservation", uselist=False, cascade="all, delete-orphan")
+    contributions = relationship("ArchivedContribution", cascade="all, delete-orphan")
+
+
+class ArchivedReservation(Base):
+    __tablename__ = "archived_reservations"
+
+    id = Column(UUID(as_uuid=False), primary_key=True)
+    item_id = Column(UUID(as_uuid=False), ForeignKey("archived_items.id", ondelete="CASCADE"), nullable=False, index=True)
+    reserver_name = Column(String(100), nullable=False)
+    reserver_email = Column(String(255), nullable=True)
+    reserver_user_id = Column(UUID(as_uuid=False), nullable=True)
+    is_cancelled = Column(Boolean)
+    created_at = Column(DateTime)
+
+
+class ArchivedContribution(Base):
+    __tablename__ = "archived_contributions"
+
+    id = Column(UUID(as_uuid=False), primary_key=True)
+    item_id = Column(UUID(as_uuid=False), ForeignKey("archived_items.id", ondelete="CASCADE"), nullable=False, index=True)
+    contributor_name = Column(String(100), nullable=False)
+    contributor_email = Column(String(255), nullable=True)
+    contributor_user_id = Column(UUID(as_uuid=False), nullable=True)
+    amount = Column(Numeric(12, 2), nullable=False)
+    created_at = Column(DateTime)
+
+
+class ItemRefreshState(Base):
+    __tablename__ = "item_refresh_state"
+
+    item_id = Column(UUID(as_uuid=False), ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    etag = Column(String(255), nullable=True)
+    last_modified = Column(String(64), nullable=True)
+    checked_at = Column(DateTime, nullable=True, index=True)
+    failures = Column(Integer, default=0)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from urllib.parse import urlsplit
+from fastapi import HTTPException
+from sqlalchemy import or_
+from . import models, schemas
+from .config import settings
+from .database import SessionLocal
+from .revisions import bump_revision
+from .routers.scraper import fetch_page
+from .routers.wishlists import build_item_out
+from .scraping.cache import normalize_url
+from .thumbnails import thumbnailer
+from .websocket_manager import manager
+from .wishlist_cache import wishlist_cache
+
+logger = logging.getLogger(__name__)
+
+
+def claim_batch(limit: int) -> list[tuple]:
+    """Pick the stalest items and lease them by stamping checked_at, so other workers skip them."""
+    State = models.ItemRefreshState
+    db = SessionLocal()
+    try:
+        cutoff = datetime.utcnow() - timedelta(seconds=settings.PRICE_REFRESH_MAX_AGE)
+        rows = (
+            db.query(models.Item.id, models.Item.url, State.etag, State.last_modified)
+            .outerjoin(State, State.item_id == models.Item.id)
+            .filter(
+                models.Item.is_deleted == False,
+                models.Item.url.isnot(None),
+                or_(State.checked_at.is_(None), State.checked_at < cutoff),
+            )
+            .order_by(State.checked_at.asc().nulls_first())
+            .limit(limit)
+            .with_for_update(of=models.Item, skip_locked=True)
+            .all()
+        )
+        now = datetime.utcnow()
+        for item_id, *_ in rows:
+            state = db.get(State, item_id)
+            if state is None:
+                db.add(State(item_id=item_id, checked_at=now, failures=0))
+            else:
+                state.checked_at = now
+        db.commit()
+        return rows
+    finally:
+        db.close()
+
+
+def apply_result(
+    item_id: str, result: schemas.ScrapeResult | None, etag: str | None, last_modified: str | None
+) -> tuple[str, dict] | None:
+    """Store validators and any new price/image; returns (slug, item payload) when the item changed."""
+    db = SessionLocal()
+    try:
+        state = db.get(models.ItemRefreshState, item_id)
+        if state is not None:
+            state.etag = etag or state.etag
+            state.last_modified = last_modified or state.last_modified
+            state.checked_at = datetime.utcnow()
+            state.failures = 0
+
+        item = db.get(models.Item, item_id)
+        changed = False
+        if result is not None and item is not None and not item.is_deleted:
+            # A failed extraction must not wipe what we already know
+            if result.price is not None and result.price != item.price:
+                item.price = result.price
+                changed = True
+            if result.image_url and result.image_url != item.image_url:
+                item.image_url = result.image_url
+                item.image_digest = None
+                changed = True
+        if changed:
+            item.updated_revision = db.execute(bump_revision(item.wishlist_id)).scalar_one()
+        db.commit()
+
+        if not changed:
+            return None
+        db.refresh(item)
+        return item.wishlist.slug, build_item_out(item, True).model_dump(mode="json")
+    finally:
+        db.close()
+
+
+def record_failure(item_id: str):
+    db = SessionLocal()
+    try:
+        state = db.get(models.ItemRefreshState, item_id)
+        if state is not None:
+            state.failures = (state.failures or 0) + 1
+            db.commit()
+    finally:
+        db.close()
+
+
+class HostThrottle:
+    """Spaces requests to one host by a fixed delay plus random jitter."""
+
+    def __init__(self, delay: float, jitter: float):
+        self.delay = delay
+        self.jitter = jitter
+        self._next_at: dict[str, float] = {}
+
+    async def wait(self, host: str):
+        now = time.monotonic()
+        if host not in self._next_at:
+            # Hosts whose turn has passed wait for nothing; forget them rather than keep every host ever seen
+            self._next_at = {h: t for h, t in self._next_at.items() if t > now}
+        at = max(now, self._next_at.get(host, 0.0))
+        self._next_at[host] = at + self.delay + random.uniform(0, self.jitter)
+        if at > now:
+            await asyncio.sleep(at - now)
+
+
+class PriceRefresher:
+    def __init__(self):
+        self._task: asyncio.Task | None = None
+        self._throttle = HostThrottle(settings.PRICE_REFRESH_HOST_DELAY, settings.PRICE_REFRESH_JITTER)
+        self.checked = 0
+        self.not_modified = 0
+        self.changed = 0
+        self.failures = 0
+
+    def start(self):
+        if settings.PRICE_REFRESH_ENABLED and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.PRICE_REFRESH_INTERVAL)
+            try:
+                await self.refresh_batch()
+            except Exception:
+                logger.exception("Price refresh batch failed")
+
+    async def refresh_batch(self) -> int:
+        batch = await asyncio.to_thread(claim_batch, settings.PRICE_REFRESH_BATCH_SIZE)
+        by_host: dict[str, list[tuple]] = defaultdict(list)
+        for row in batch:
+            try:
+                url = normalize_url(row[1])
+            except ValueError:
+                # A stored URL that can't be parsed (bad port, broken IPv6 host) fails alone
+                self.failures += 1
+                await asyncio.to_thread(record_failure, row[0])
+                continue
+            by_host[urlsplit(url).hostname or ""].append((row[0], url, row[2], row[3]))
+
+        # One sequential walker per host keeps the per-shop spacing; the semaphore caps total fetches
+        slots = asyncio.Semaphore(settings.PRICE_REFRESH_CONCURRENCY)
+        await asyncio.gather(*(self._refresh_host(host, rows, slots) for host, rows in by_host.items()))
+        return len(batch)
+
+    async def _refresh_host(self, host: str, rows: list[tuple], slots: asyncio.Semaphore):
+        for item_id, url, etag, last_modified in rows:
+            await self._throttle.wait(host)
+            headers = {}
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+            try:
+                async with slots:
+                    result, resp_headers = await fetch_page(url, headers=headers)
+            except HTTPException:
+                self.failures += 1
+                await asyncio.to_thread(record_failure, item_id)
+                continue
+
+            self.checked += 1
+            if result is None:
+                self.not_modified += 1
+            update = await asyncio.to_thread(
+                apply_result, item_id, result, resp_headers.get("etag"), resp_headers.get("last-modified")
+            )
+            if update:
+                self.changed += 1
+                slug, item = update
+                wishlist_cache.invalidate(slug)
+                manager.broadcast(slug, {"type": "item_updated", "item": item})
+                if not item["thumbnails"]:
+                    thumbnailer.schedule(item_id, item["image_url"])
+
+    def snapshot(self) -> dict:
+        return {
+            "enabled": settings.PRICE_REFRESH_ENABLED,
+            "running": self._task is not None and not self._task.done(),
+            "checked": self.checked,
+            "not_modified": self.not_modified,
+            "changed": self.changed,
+            "failures": self.failures,
+        }
+
+
+price_refresher = PriceRefresher()
@@ -0,0 +1,213 @@
+"""Cross-process delivery of realtime events.
+
+Each process delivers its own events to its own sockets directly; the bus only carries
+them to the other processes. With REALTIME_BACKEND=postgres every process LISTENs on one
+channel and NOTIFYs what it broadcasts, skipping the echoes of its own messages, so each
+event reaches every process once.
+"""
+import asyncio
+import itertools
+import logging
+import time
+import uuid
+from typing import Callable, Optional
+from sqlalchemy.engine import make_url
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+# (slug, event JSON or None for "cache invalidation only")
+Handler = Callable[[str, Optional[str]], None]
+# Called whenever LISTEN (re)starts: whatever was sent while it was down is lost
+Resync = Callable[[], None]
+
+# NOTIFY payloads must stay under 8000 bytes; bigger events go out in pieces and are reassembled
+MAX_PAYLOAD = 7900
+# Pieces of a message whose rest never arrived are forgotten after this many seconds
+PARTIAL_TTL = 30.0
+# How often the LISTEN connection is pinged, busy or not
+LISTEN_CHECK_INTERVAL = 5.0
+
+
+class LocalBus:
+    """Single process: nothing to forward."""
+
+    name = "local"
+
+    async def start(self, handler: Handler, resync: Resync):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, slug: str, text: str | None):
+        pass
+
+    def snapshot(self) -> dict:
+        return {"backend": self.name}
+
+
+class PostgresBus:
+    name = "postgres"
+
+    def __init__(self, dsn: str, channel: str, outbox_size: int):
+        self.dsn = dsn
+        self.channel = channel
+        self.worker_id = uuid.uuid4().hex[:12]
+        self._outbox: asyncio.Queue[str] | None = None
+        self._outbox_size = outbox_size
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._handler: Handler | None = None
+        self._resync: Resync | None = None
+        self._task: asyncio.Task | None = None
+        self._ids = itertools.count(1)  # next() is atomic, publish may run on several threads
+        # (worker, message id) -> (first seen, pieces)
+        self._partial: dict[tuple[str, str], tuple[float, list[str | None]]] = {}
+        self.published = 0
+        self.received = 0
+        self.dropped = 0
+        self.reconnects = 0
+
+    async def start(self, handler: Handler, resync: Resync):
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._handler = handler
+            self._resync = resync
+            self._outbox = asyncio.Queue(maxsize=self._outbox_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def publish(self, slug: str, text: str | None):
+        """Queue a message for the other processes; callable from the loop or from worker threads."""
+        if self._loop is None:
+            return
+        header = f"{self.worker_id} {next(self._ids):x}"
+        body = text or ""
+        room = MAX_PAYLOAD - len(f"{header} 0000 0000 {slug}\n".encode())
+        pieces = [body[i:i + room] for i in range(0, len(body), room)] if body else []
+        payloads = [f"{header} {i} {len(pieces)} {slug}\n{piece}" for i, piece in enumerate(pieces)]
+        if not payloads:
+            payloads = [f"{header} 0 0 {slug}\n"]
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            self._enqueue(payloads)
+        else:
+            self._loop.call_soon_threadsafe(self._enqueue, payloads)
+
+    def _enqueue(self, payloads: list[str]):
+        for payload in payloads:
+            try:
+                self._outbox.put_nowait(payload)
+            except asyncio.QueueFull:
+                # The database is unreachable or far behind; other processes' viewers refetch on reconnect
+                self.dropped += 1
+                return
+
+    async def _run(self):
+        import asyncpg
+
+        while True:
+            listener = publisher = None
+            try:
+                listener = await asyncpg.connect(self.dsn)
+                publisher = await asyncpg.connect(self.dsn)
+                await listener.add_listener(self.channel, self._on_notify)
+                self._listening()
+                next_check = time.monotonic() + LISTEN_CHECK_INTERVAL
+                while True:
+                    if listener.is_closed():
+                        raise ConnectionError("LISTEN connection closed")
+                    wait = next_check - time.monotonic()
+                    if wait <= 0:
+                        # Checked on a clock, not only when idle: a steady outbox must not hide a
+                        # dead listener, and a round-trip also catches a half-open socket
+                        async with asyncio.timeout(LISTEN_CHECK_INTERVAL):
+                            await listener.execute("SELECT 1")
+                        next_check = time.monotonic() + LISTEN_CHECK_INTERVAL
+                        continue
+                    try:
+                        async with asyncio.timeout(wait):
+                            payload = await self._outbox.get()
+                    except TimeoutError:
+                        continue
+                    await publisher.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                    self.published += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                self.reconnects += 1
+                logger.warning("Realtime bus connection lost, reconnecting", exc_info=True)
+                await asyncio.sleep(1.0)
+            finally:
+                for conn in (listener, publisher):
+                    if conn is not None and not conn.is_closed():
+                        conn.terminate()
+
+    def _listening(self):
+        # NOTIFYs sent while nobody was listening are gone for good
+        self._partial.clear()
+        try:
+            self._resync()
+        except Exception:
+            logger.exception("Realtime bus resync failed")
+
+    def _on_notify(self, connection, pid, channel: str, payload: str):
+        header, _, piece = payload.partition("\n")
+        worker, message_id, index, count, slug = header.split(" ", 4)
+        if worker == self.worker_id:
+            return
+        index, count = int(index), int(count)
+        if count <= 1:
+            self._deliver(slug, piece if count else None)
+            return
+
+        now = time.monotonic()
+        for key in [k for k, (seen, _) in self._partial.items() if now - seen > PARTIAL_TTL]:
+            del self._partial[key]
+        _, pieces = self._partial.setdefault((worker, message_id), (now, [None] * count))
+        pieces[index] = piece
+        if all(p is not None for p in pieces):
+            del self._partial[(worker, message_id)]
+            self._deliver(slug, "".join(pieces))
+
+    def _deliver(self, slug: str, text: str | None):
+        self.received += 1
+        try:
+            self._handler(slug, text)
+        except Exception:
+            logger.exception("Realtime bus handler failed")
+
+    def snapshot(self) -> dict:
+        return {
+            "backend": self.name,
+            "worker_id": self.worker_id,
+            "channel": self.channel,
+            "running": self._task is not None and not self._task.done(),
+            "queued": self._outbox.qsize() if self._outbox is not None else 0,
+            "published": self.published,
+            "received": self.received,
+            "dropped": self.dropped,
+            "reconnects": self.reconnects,
+        }
+
+
+def make_bus():
+    if settings.REALTIME_BACKEND == "postgres":
+        # asyncpg wants a plain postgresql:// DSN, without SQLAlchemy's +driver suffix
+        dsn = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+        return PostgresBus(dsn, settings.REALTIME_CHANNEL, settings.REALTIME_OUTBOX_SIZE)
+    return LocalBus()
+
+
+bus = make_bus()
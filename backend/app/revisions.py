@@ -0,0 +1,18 @@
+from sqlalchemy import update
+from . import models
+
+
+def bump_revision(wishlist_id: str, **values):
+    """UPDATE ... RETURNING the wishlist's next revision; `values` are set in the same statement.
+
+    The row lock it takes orders concurrent writers, so revisions commit in increasing order.
+    updated_at is left alone unless passed: item, reservation and counter writes are not
+    edits of the wishlist itself.
+    """
+    values = {"updated_at": models.Wishlist.updated_at, **values}
+    return (
+        update(models.Wishlist)
+        .where(models.Wishlist.id == wishlist_id)
+        .values(revision=models.Wishlist.revision + 1, **values)
+        .returning(models.Wishlist.revision)
+    )
@@ -1,41 +1,50 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
-from ..database import get_db
-from ..auth import hash_password, verify_password, create_access_token, require_user
+from ..database import get_async_db
+from ..auth import create_access_token, require_user
+from ..hashing import password_hasher
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=schemas.Token)
-def register(data: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(models.User).filter(models.User.email == data.email).first()
+async def register(data: schemas.UserCreate, db: AsyncSession = Depends(get_async_db)):
+    existing = await db.scalar(select(models.User.id).where(models.User.email == data.email))
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     user = models.User(
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await password_hasher.hash(data.password),
         name=data.name,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
 
     token = create_access_token({"sub": user.id})
     return {"access_token": token, "token_type": "bearer", "user": user}
 
 
 @router.post("/login", response_model=schemas.Token)
-def login(data: schemas.UserLogin, db: Session = Depends(get_db)):
-    user = db.query(models.User).filter(models.User.email == data.email).first()
-    if not user or not verify_password(data.password, user.password_hash):
+async def login(data: schemas.UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await db.scalar(select(models.User).where(models.User.email == data.email))
+    if not user:
         raise HTTPException(status_code=401, detail="Invalid email or password")
+    ok, new_hash = await password_hasher.verify(data.password, user.password_hash)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Invalid email or password")
+    if new_hash:
+        # Stored with an older cost factor; swap in the current one while we have the password
+        user.password_hash = new_hash
+        await db.commit()
 
     token = create_access_token({"sub": user.id})
     return {"access_token": token, "token_type": "bearer", "user": user}
 
 
 @router.get("/me", response_model=schemas.UserOut)
-def me(user: models.User = Depends(require_user)):
+def me(user: schemas.UserOut = Depends(require_user)):
     return user
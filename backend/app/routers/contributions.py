@@ -1,10 +1,12 @@
-from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
-from ..database import get_db
-from ..auth import get_current_user
+from ..database import get_async_db
+from ..auth import Principal, get_current_principal
+from ..revisions import bump_revision
 from ..websocket_manager import manager
+from ..wishlist_cache import wishlist_cache
 
 router = APIRouter(prefix="/wishlists/{slug}/items/{item_id}/contribute", tags=["contributions"])
 
@@ -14,25 +16,27 @@ async def contribute(
     slug: str,
     item_id: str,
     data: schemas.ContributeToItem,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_principal),
 ):
-    wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
+    wl = await db.scalar(select(models.Wishlist).where(models.Wishlist.slug == slug))
     if not wl:
         raise HTTPException(status_code=404, detail="Wishlist not found")
 
     if user and user.id == wl.user_id:
         raise HTTPException(status_code=400, detail="Cannot contribute to your own wishlist items")
 
-    item = (
-        db.query(models.Item)
-        .filter(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
-        .options(joinedload(models.Item.contributions))
-        .first()
+    item = await db.scalar(
+        select(models.Item).where(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
     )
     if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    if item.is_deleted:
+        # Compacted into the archive; contributors still need the refund notice, not a 404
+        archived = await db.scalar(
+            select(models.ArchivedItem.id).where(models.ArchivedItem.id == item_id, models.ArchivedItem.wishlist_id == wl.id)
+        )
+        if not archived:
+            raise HTTPException(status_code=404, detail="Item not found")
+    if not item or item.is_deleted:
         raise HTTPException(
             status_code=400,
             detail="This item has been removed. Contributors should coordinate a refund outside the app."
@@ -40,9 +44,45 @@ async def contribute(
     if not item.is_group_gift:
         raise HTTPException(status_code=400, detail="This item doesn't accept group contributions")
 
-    total_so_far = sum(c.amount for c in item.contributions)
-    if item.target_amount and total_so_far >= item.target_amount:
+    if item.target_amount and item.contributed_total >= item.target_amount:
+        raise HTTPException(status_code=400, detail="Target amount already reached")
+
+    # One conditional UPDATE settles the race: concurrent contributions queue on the item row and each
+    # re-checks the updated total. Like before, the one that reaches the target may overshoot it
+    Item = models.Item
+    counters = (await db.execute(
+        update(Item)
+        .where(
+            Item.id == item.id,
+            Item.is_deleted == False,
+            Item.is_group_gift == True,
+            or_(
+                Item.target_amount.is_(None),
+                Item.target_amount == 0,
+                Item.contributed_total < Item.target_amount,
+            ),
+        )
+        .values(
+            contributed_total=Item.contributed_total + data.amount,
+            contributors_count=Item.contributors_count + 1,
+        )
+        .returning(Item.contributed_total, Item.contributors_count)
+    )).one_or_none()
+    if counters is None:
+        await db.rollback()
+        # Re-read: the item may have been deleted or compacted since the first read
+        item = await db.scalar(select(models.Item).where(models.Item.id == item_id))
+        if not item:
+            raise HTTPException(status_code=404, detail="Item not found")
+        if item.is_deleted:
+            raise HTTPException(
+                status_code=400,
+                detail="This item has been removed. Contributors should coordinate a refund outside the app."
+            )
+        if not item.is_group_gift:
+            raise HTTPException(status_code=400, detail="This item doesn't accept group contributions")
         raise HTTPException(status_code=400, detail="Target amount already reached")
+    new_total, new_count = counters
 
     contribution = models.Contribution(
         item_id=item.id,
@@ -52,15 +92,17 @@ async def contribute(
         amount=data.amount,
     )
     db.add(contribution)
-    db.commit()
-    db.refresh(contribution)
+    # Wishlist row last, like every write path, so it is held only for the bump
+    revision = (await db.execute(bump_revision(wl.id))).scalar_one()
+    await db.execute(update(Item).where(Item.id == item.id).values(updated_revision=revision))
+    await db.commit()
 
-    new_total = total_so_far + data.amount
-    await manager.broadcast(slug, {
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {
         "type": "contribution_added",
         "item_id": item_id,
         "total_contributed": float(new_total),
-        "contributors_count": len(item.contributions) + 1,
+        "contributors_count": new_count,
         "contributor_name": data.contributor_name,
     })
 
@@ -0,0 +1,136 @@
+import csv
+import io
+import json
+from typing import Iterator, Literal
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, select
+from sqlalchemy.orm import Session, selectinload
+from .. import models, schemas
+from ..database import SessionLocal, get_db
+from ..auth import Principal, get_current_principal, require_principal
+from .wishlists import build_item_out
+
+router = APIRouter(prefix="/export", tags=["export"])
+
+# Rows fetched per round-trip from the server-side cursor, and bytes buffered per chunk sent
+BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+CSV_COLUMNS = [
+    "wishlist_slug", "wishlist_title", "item_id", "name", "url", "price", "description", "priority",
+    "is_group_gift", "target_amount", "is_reserved", "total_contributed", "contributors_count",
+    "contributors", "created_at",
+]
+
+
+def wishlist_out(wl: models.Wishlist) -> schemas.WishlistOut:
+    return schemas.WishlistOut(
+        id=wl.id, user_id=wl.user_id, title=wl.title, description=wl.description,
+        cover_emoji=wl.cover_emoji, slug=wl.slug, is_public=wl.is_public,
+        created_at=wl.created_at, updated_at=wl.updated_at, item_count=wl.active_item_count,
+    )
+
+
+def export_rows(wishlist_filter, is_owner: bool) -> Iterator[tuple[models.Wishlist, schemas.ItemOut | None]]:
+    """(wishlist, item) pairs in display order, streamed from a server-side cursor.
+
+    Runs in its own session: the request's session is closed before the response body is sent.
+    Lists without live items come through once with item None.
+    """
+    Wishlist, Item = models.Wishlist, models.Item
+    db = SessionLocal()
+    try:
+        query = (
+            select(Wishlist, Item)
+            .outerjoin(Item, and_(Item.wishlist_id == Wishlist.id, Item.is_deleted == False))
+            .where(wishlist_filter)
+            .order_by(Wishlist.created_at.desc(), Wishlist.id.desc(),
+                      Item.priority.desc(), Item.created_at, Item.id)
+            .execution_options(yield_per=BATCH_SIZE)
+        )
+        if not is_owner:
+            # Guests see contributor names; loaded per batch with one IN query
+            query = query.options(selectinload(Item.contributions))
+        for wl, item in db.execute(query):
+            yield wl, build_item_out(item, is_owner) if item is not None else None
+    finally:
+        db.close()
+
+
+def ndjson_lines(rows) -> Iterator[str]:
+    current = None
+    for wl, item in rows:
+        if wl.id != current:
+            current = wl.id
+            yield json.dumps({"type": "wishlist", **wishlist_out(wl).model_dump(mode="json")}, ensure_ascii=False) + "\n"
+        if item is not None:
+            yield json.dumps({"type": "item", **item.model_dump(mode="json")}, ensure_ascii=False) + "\n"
+
+
+def csv_lines(rows) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for wl, item in rows:
+        if item is None:
+            continue
+        writer.writerow([
+            wl.slug, wl.title, item.id, item.name, item.url, item.price, item.description, item.priority,
+            item.is_group_gift, item.target_amount, item.is_reserved, item.total_contributed,
+            item.contributors_count, "; ".join(c.contributor_name for c in item.contributors),
+            item.created_at.isoformat(),
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def chunked(lines: Iterator[str]) -> Iterator[bytes]:
+    buffer = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield "".join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield "".join(buffer).encode()
+
+
+def export_response(rows, format: str, filename: str) -> StreamingResponse:
+    lines = ndjson_lines(rows) if format == "ndjson" else csv_lines(rows)
+    # A sync iterator: Starlette drives it in the threadpool, so the cursor never blocks the event loop
+    return StreamingResponse(
+        chunked(lines),
+        media_type=MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{format}"'},
+    )
+
+
+@router.get("/wishlists")
+def export_my_wishlists(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    user: Principal = Depends(require_principal),
+):
+    return export_response(export_rows(models.Wishlist.user_id == user.id, True), format, "wishlists")
+
+
+@router.get("/wishlists/{slug}")
+def export_wishlist(
+    slug: str,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+):
+    wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
+    if not wl:
+        raise HTTPException(status_code=404, detail="Wishlist not found")
+    if not wl.is_public and (not user or user.id != wl.user_id):
+        raise HTTPException(status_code=403, detail="This wishlist is private")
+    is_owner = bool(user and user.id == wl.user_id)
+    return export_response(export_rows(models.Wishlist.id == wl.id, is_owner), format, wl.slug)
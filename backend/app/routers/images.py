@@ -0,0 +1,39 @@
+import re
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import FileResponse, RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .. import models
+from ..config import settings
+from ..database import get_async_db
+from ..thumbnails import FORMATS, thumbnail_path, thumbnailer
+
+router = APIRouter(prefix="/images", tags=["images"])
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+@router.get("/{digest}/{width}.{ext}")
+async def get_thumbnail(digest: str, width: int, ext: str, db: AsyncSession = Depends(get_async_db)):
+    if not DIGEST_RE.match(digest) or width not in settings.THUMBNAIL_WIDTHS or ext not in FORMATS:
+        raise HTTPException(status_code=404, detail="Image not found")
+    path = thumbnail_path(digest, width, ext)
+    if not path.is_file():
+        # Media lives on this replica's disk and is lost on redeploy: render it again,
+        # and send the client to the original image in the meantime
+        source = (await db.execute(
+            select(models.Item.id, models.Item.image_url)
+            .where(models.Item.image_digest == digest, models.Item.image_url.isnot(None))
+            .limit(1)
+        )).first()
+        if source is None:
+            raise HTTPException(status_code=404, detail="Image not found")
+        thumbnailer.restore(source.id, source.image_url)
+        return RedirectResponse(source.image_url, status_code=307, headers={"Cache-Control": "no-store"})
+    # Content-addressed: a given URL never changes, so clients and CDNs may keep it forever.
+    # FileResponse answers Range requests itself.
+    return FileResponse(
+        path,
+        media_type=FORMATS[ext][1],
+        headers={"Cache-Control": "public, max-age=31536000, immutable"},
+    )
@@ -0,0 +1,42 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from ..auth_cache import token_cache, user_cache
+from ..compaction import item_compactor
+from ..config import settings
+from ..database import async_pool_stats, pool_stats
+from ..hashing import password_hasher
+from ..price_refresh import price_refresher
+from ..pubsub import bus
+from ..scraping.cache import scrape_cache
+from ..scraping.client import scraper_client
+from ..scraping.workers import parse_pool
+from ..thumbnails import thumbnailer
+from ..websocket_manager import manager
+from ..wishlist_cache import wishlist_cache
+
+
+def require_internal_token(x_internal_token: str = Header("")):
+    expected = settings.INTERNAL_STATS_TOKEN
+    if not expected or not secrets.compare_digest(x_internal_token.encode(), expected.encode()):
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+
+router = APIRouter(prefix="/internal", tags=["internal"], dependencies=[Depends(require_internal_token)])
+
+
+@router.get("/stats")
+def stats():
+    return {
+        "scraper_http": scraper_client.stats.snapshot(),
+        "scrape_cache": scrape_cache.snapshot(),
+        "scrape_parse": parse_pool.snapshot(),
+        "price_refresh": price_refresher.snapshot(),
+        "thumbnails": thumbnailer.snapshot(),
+        "compaction": item_compactor.snapshot(),
+        "wishlist_cache": wishlist_cache.snapshot(),
+        "websockets": manager.snapshot(),
+        "realtime_bus": bus.snapshot(),
+        "password_hash": password_hasher.snapshot(),
+        "auth_cache": {"tokens": token_cache.snapshot(), "users": user_cache.snapshot()},
+        "db_pool": {"sync": pool_stats.snapshot(), "async": async_pool_stats.snapshot()},
+    }
@@ -1,18 +1,24 @@
-from datetime import datetime
+import asyncio
+from datetime import datetime, timedelta
 from decimal import Decimal
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
-from ..database import get_db
-from ..auth import require_user
+from ..database import get_async_db
+from ..auth import Principal, require_principal
+from ..revisions import bump_revision
+from ..thumbnails import thumbnailer
 from ..websocket_manager import manager
+from ..wishlist_cache import wishlist_cache
+from .scraper import scrape_in_batch
 from .wishlists import build_item_out
 
 router = APIRouter(prefix="/wishlists/{slug}/items", tags=["items"])
 
 
-def get_wishlist_or_404(slug: str, db: Session) -> models.Wishlist:
-    wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
+async def get_wishlist_or_404(slug: str, db: AsyncSession) -> models.Wishlist:
+    wl = await db.scalar(select(models.Wishlist).where(models.Wishlist.slug == slug))
     if not wl:
         raise HTTPException(status_code=404, detail="Wishlist not found")
     return wl
@@ -22,10 +28,10 @@ def get_wishlist_or_404(slug: str, db: Session) -> models.Wishlist:
 async def add_item(
     slug: str,
     data: schemas.ItemCreate,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(require_principal),
 ):
-    wl = get_wishlist_or_404(slug, db)
+    wl = await get_wishlist_or_404(slug, db)
     if wl.user_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
@@ -40,9 +46,12 @@ async def add_item(
         is_group_gift=data.is_group_gift,
         target_amount=data.target_amount,
     )
+    item.updated_revision = (await db.execute(
+        bump_revision(wl.id, active_item_count=models.Wishlist.active_item_count + 1)
+    )).scalar_one()
     db.add(item)
-    db.commit()
-    db.refresh(item)
+    await db.commit()
+    await db.refresh(item)
 
     out = schemas.ItemOut(
         id=item.id, wishlist_id=item.wishlist_id, name=item.name, url=item.url,
@@ -53,7 +62,75 @@ async def add_item(
         total_contributed=Decimal("0"), contributors_count=0, contributors=[],
     )
 
-    await manager.broadcast(slug, {"type": "item_added", "item": out.model_dump(mode="json")})
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {"type": "item_added", "item": out.model_dump(mode="json")})
+    thumbnailer.schedule(item.id, item.image_url)
+    return out
+
+
+async def autofill_item(data: schemas.ItemCreate) -> schemas.ItemCreate:
+    """Copy of `data` with missing price / image / description taken from its URL; unchanged on failure."""
+    missing = [f for f in ("price", "image_url", "description") if getattr(data, f) is None]
+    if not data.url or not missing:
+        return data
+    try:
+        scraped = await scrape_in_batch(data.url)
+    except Exception:
+        return data
+    return data.model_copy(update={f: getattr(scraped, f) for f in missing if getattr(scraped, f) is not None})
+
+
+@router.post("/bulk", response_model=list[schemas.ItemOut], status_code=201)
+async def add_items(
+    slug: str,
+    data: schemas.ItemBulkCreate,
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(require_principal),
+):
+    wl = await get_wishlist_or_404(slug, db)
+    if wl.user_id != user.id:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
+    payloads = data.items
+    if data.autofill:
+        # Scrape before the transaction starts, so the wishlist row isn't locked while pages download
+        payloads = await asyncio.gather(*(autofill_item(p) for p in payloads))
+
+    revision = (await db.execute(
+        bump_revision(wl.id, active_item_count=models.Wishlist.active_item_count + len(payloads))
+    )).scalar_one()
+    # Microsecond steps keep the submitted order among items of equal priority
+    now = datetime.utcnow()
+    rows = [
+        {
+            "id": models.gen_uuid(),
+            "wishlist_id": wl.id,
+            "name": p.name,
+            "url": str(p.url) if p.url else None,
+            "price": p.price,
+            "image_url": str(p.image_url) if p.image_url else None,
+            "description": p.description,
+            "priority": p.priority,
+            "is_group_gift": p.is_group_gift,
+            "target_amount": p.target_amount,
+            "created_at": now + timedelta(microseconds=i),
+            "updated_revision": revision,
+        }
+        for i, p in enumerate(payloads)
+    ]
+    await db.execute(insert(models.Item), rows)
+    await db.commit()
+
+    out = [
+        schemas.ItemOut(**row, is_deleted=False, is_reserved=False, total_contributed=Decimal("0"),
+                        contributors_count=0, contributors=[])
+        for row in rows
+    ]
+
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {"type": "items_added", "items": [o.model_dump(mode="json") for o in out]})
+    for row in rows:
+        thumbnailer.schedule(row["id"], row["image_url"])
     return out
 
 
@@ -62,29 +139,33 @@ async def update_item(
     slug: str,
     item_id: str,
     data: schemas.ItemUpdate,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(require_principal),
 ):
-    wl = get_wishlist_or_404(slug, db)
+    wl = await get_wishlist_or_404(slug, db)
     if wl.user_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    item = (
-        db.query(models.Item)
-        .filter(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
-        .options(joinedload(models.Item.reservation), joinedload(models.Item.contributions))
-        .first()
+    item = await db.scalar(
+        select(models.Item).where(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
     )
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
+    old_image_url = item.image_url
     for field, value in data.model_dump(exclude_none=True).items():
         setattr(item, field, value)
-    db.commit()
-    db.refresh(item)
+    image_changed = item.image_url != old_image_url
+    if image_changed:
+        item.image_digest = None
+    item.updated_revision = (await db.execute(bump_revision(wl.id))).scalar_one()
+    await db.commit()
 
     out = build_item_out(item, True)
-    await manager.broadcast(slug, {"type": "item_updated", "item": out.model_dump(mode="json")})
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {"type": "item_updated", "item": out.model_dump(mode="json")})
+    if image_changed:
+        thumbnailer.schedule(item.id, item.image_url)
     return out
 
 
@@ -92,21 +173,26 @@ async def update_item(
 async def delete_item(
     slug: str,
     item_id: str,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(require_principal),
 ):
-    wl = get_wishlist_or_404(slug, db)
+    wl = await get_wishlist_or_404(slug, db)
     if wl.user_id != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
-    item = db.query(models.Item).filter(
-        models.Item.id == item_id, models.Item.wishlist_id == wl.id
-    ).first()
+    item = await db.scalar(
+        select(models.Item).where(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
+    )
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    item.is_deleted = True
-    item.deleted_at = datetime.utcnow()
-    db.commit()
+    if not item.is_deleted:
+        item.is_deleted = True
+        item.deleted_at = datetime.utcnow()
+        item.updated_revision = (await db.execute(
+            bump_revision(wl.id, active_item_count=models.Wishlist.active_item_count - 1)
+        )).scalar_one()
+        await db.commit()
 
-    await manager.broadcast(slug, {"type": "item_deleted", "item_id": item_id})
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {"type": "item_deleted", "item_id": item_id})
@@ -1,22 +1,41 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from .. import models, schemas
-from ..database import get_db
-from ..auth import get_current_user
+from ..database import get_async_db
+from ..auth import Principal, get_current_principal
+from ..revisions import bump_revision
 from ..websocket_manager import manager
+from ..wishlist_cache import wishlist_cache
 
 router = APIRouter(prefix="/wishlists/{slug}/items/{item_id}/reserve", tags=["reservations"])
 
+# INSERT ... ON CONFLICT is dialect-specific in SQLAlchemy
+DIALECT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+async def set_reserved(db: AsyncSession, wishlist_id: str, item_id: str, reserved: bool):
+    """Flip the item's flag, then bump the revision: the item row is locked before the wishlist row.
+
+    Every write path goes item rows first, wishlist row last, so writers never deadlock and
+    guest writes to different items only queue on the wishlist row for the bump itself.
+    """
+    Item = models.Item
+    await db.execute(update(Item).where(Item.id == item_id).values(is_reserved=reserved))
+    revision = (await db.execute(bump_revision(wishlist_id))).scalar_one()
+    await db.execute(update(Item).where(Item.id == item_id).values(updated_revision=revision))
+
 
 @router.post("/", response_model=schemas.ReservationOut, status_code=201)
 async def reserve_item(
     slug: str,
     item_id: str,
     data: schemas.ReserveItem,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_principal),
 ):
-    wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
+    wl = await db.scalar(select(models.Wishlist).where(models.Wishlist.slug == slug))
     if not wl:
         raise HTTPException(status_code=404, detail="Wishlist not found")
 
@@ -24,43 +43,48 @@ async def reserve_item(
     if user and user.id == wl.user_id:
         raise HTTPException(status_code=400, detail="Cannot reserve items in your own wishlist")
 
-    item = (
-        db.query(models.Item)
-        .filter(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
-        .options(joinedload(models.Item.reservation))
-        .first()
+    item = await db.scalar(
+        select(models.Item).where(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
     )
     if not item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    if item.is_deleted:
+        archived = await db.scalar(
+            select(models.ArchivedItem.id).where(models.ArchivedItem.id == item_id, models.ArchivedItem.wishlist_id == wl.id)
+        )
+        if not archived:
+            raise HTTPException(status_code=404, detail="Item not found")
+    if not item or item.is_deleted:
         raise HTTPException(status_code=400, detail="This item has been removed from the wishlist")
     if item.is_group_gift:
         raise HTTPException(status_code=400, detail="This is a group gift — use contributions instead")
-
-    existing = item.reservation
-    if existing and not existing.is_cancelled:
+    if item.is_reserved:
         raise HTTPException(status_code=400, detail="This item is already reserved")
 
-    if existing and existing.is_cancelled:
-        existing.reserver_name = data.reserver_name
-        existing.reserver_email = data.reserver_email
-        existing.reserver_user_id = user.id if user else None
-        existing.is_cancelled = False
-        db.commit()
-        db.refresh(existing)
-        reservation = existing
-    else:
-        reservation = models.Reservation(
-            item_id=item.id,
-            reserver_name=data.reserver_name,
-            reserver_email=data.reserver_email,
-            reserver_user_id=user.id if user else None,
+    # One statement decides the race: a new row, or taking over a cancelled one; a live one is left alone
+    holder = {
+        "reserver_name": data.reserver_name,
+        "reserver_email": data.reserver_email,
+        "reserver_user_id": user.id if user else None,
+        "is_cancelled": False,
+    }
+    insert = DIALECT_INSERTS[db.bind.dialect.name]
+    reservation = (await db.execute(
+        insert(models.Reservation)
+        .values(item_id=item.id, **holder)
+        .on_conflict_do_update(
+            index_elements=[models.Reservation.item_id],
+            set_=holder,
+            where=models.Reservation.is_cancelled == True,
         )
-        db.add(reservation)
-        db.commit()
-        db.refresh(reservation)
+        .returning(models.Reservation.id, models.Reservation.item_id, models.Reservation.created_at)
+    )).one_or_none()
+    if reservation is None:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="This item is already reserved")
+    await set_reserved(db, wl.id, item.id, True)
+    await db.commit()
 
-    await manager.broadcast(slug, {
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {
         "type": "item_reserved",
         "item_id": item_id,
         "reserver_name": data.reserver_name,
@@ -69,7 +93,7 @@ async def reserve_item(
     return schemas.ReservationOut(
         id=reservation.id,
         item_id=reservation.item_id,
-        reserver_name=reservation.reserver_name,
+        reserver_name=data.reserver_name,
         created_at=reservation.created_at,
     )
 
@@ -78,23 +102,30 @@ async def reserve_item(
 async def cancel_reservation(
     slug: str,
     item_id: str,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+    user: Principal = Depends(get_current_principal),
 ):
-    wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
+    wl = await db.scalar(select(models.Wishlist).where(models.Wishlist.slug == slug))
     if not wl:
         raise HTTPException(status_code=404, detail="Wishlist not found")
 
-    item = (
-        db.query(models.Item)
-        .filter(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
-        .options(joinedload(models.Item.reservation))
-        .first()
+    item = await db.scalar(
+        select(models.Item).where(models.Item.id == item_id, models.Item.wishlist_id == wl.id)
     )
-    if not item or not item.reservation or item.reservation.is_cancelled:
+    if not item or not item.is_reserved:
         raise HTTPException(status_code=404, detail="No active reservation found")
 
-    item.reservation.is_cancelled = True
-    db.commit()
+    cancelled = (await db.execute(
+        update(models.Reservation)
+        .where(models.Reservation.item_id == item.id, models.Reservation.is_cancelled == False)
+        .values(is_cancelled=True)
+        .returning(models.Reservation.id)
+    )).one_or_none()
+    if cancelled is None:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail="No active reservation found")
+    await set_reserved(db, wl.id, item.id, False)
+    await db.commit()
 
-    await manager.broadcast(slug, {"type": "item_unreserved", "item_id": item_id})
+    wishlist_cache.invalidate(slug)
+    manager.broadcast(slug, {"type": "item_unreserved", "item_id": item_id})
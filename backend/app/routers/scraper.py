@@ -1,121 +1,136 @@
-import re
-from decimal import Decimal
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+import json
 import httpx
-from bs4 import BeautifulSoup
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, field_validator
+from ..config import settings
 from ..schemas import ScrapeResult
+from ..scraping.cache import normalize_url, scrape_cache
+from ..scraping.client import scraper_client
+from ..scraping.extract import StreamingExtractor
+from ..scraping.rules import ExtractionRule, rule_for
+from ..scraping.workers import ParsePoolFull, parse_pool
 
 router = APIRouter(prefix="/scrape", tags=["scraper"])
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    ),
-    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
-}
-
 
 class ScrapeRequest(BaseModel):
     url: str
 
 
-def extract_price(text: str) -> Decimal | None:
-    # Find first number that looks like a price
-    pattern = r"[\d\s,]+\.?\d*"
-    matches = re.findall(pattern, text)
-    for m in matches:
-        cleaned = re.sub(r"[\s,]", "", m).replace(",", ".")
-        try:
-            val = Decimal(cleaned)
-            if val > 0:
-                return val
-        except Exception:
-            continue
-    return None
+class BatchScrapeRequest(BaseModel):
+    urls: list[str]
+
+    @field_validator("urls")
+    @classmethod
+    def urls_limit(cls, v):
+        if not v:
+            raise ValueError("At least one URL is required")
+        if len(v) > settings.SCRAPE_BATCH_MAX_URLS:
+            raise ValueError(f"At most {settings.SCRAPE_BATCH_MAX_URLS} URLs per batch")
+        return v
 
 
-def get_og_meta(soup: BeautifulSoup, prop: str) -> str | None:
-    tag = soup.find("meta", property=f"og:{prop}") or soup.find("meta", attrs={"name": f"og:{prop}"})
-    if tag:
-        return tag.get("content")
-    return None
+# Shared by all batch requests so several imports at once can't flood the pool
+batch_slots = asyncio.Semaphore(settings.SCRAPE_BATCH_CONCURRENCY)
+
+CHUNK_SIZE = 64 * 1024
+
+
+async def fetch_page(
+    url: str, rule: ExtractionRule | None = None, headers: dict | None = None
+) -> tuple[ScrapeResult | None, httpx.Headers]:
+    """Fetch and extract one page; the result is None when a conditional GET got 304."""
+    rule = rule or rule_for(url)
+    try:
+        with parse_pool.lane() as lane:
+            try:
+                async with scraper_client.stream(url, headers=headers) as resp:
+                    if resp.status_code == 304:
+                        return None, resp.headers
+                    resp.raise_for_status()
+                    extractor = StreamingExtractor(resp.charset_encoding, rule=rule)
+                    async for chunk in resp.aiter_bytes(CHUNK_SIZE):
+                        # Parsing runs in the pool; stop downloading once everything needed is seen
+                        if await parse_pool.run(lane, extractor.feed, chunk):
+                            break
+            except ParsePoolFull:
+                raise
+            except Exception as e:
+                raise HTTPException(status_code=422, detail=f"Could not fetch URL: {str(e)}")
+
+            return await parse_pool.run(lane, extractor.result), resp.headers
+    except ParsePoolFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Scraper is busy, try again shortly",
+            headers={"Retry-After": "2"},
+        )
+
+
+async def fetch_and_extract(url: str, rule: ExtractionRule | None = None) -> ScrapeResult:
+    result, _ = await fetch_page(url, rule)
+    return result
+
+
+def cache_key(url: str) -> str:
+    try:
+        return normalize_url(url)
+    except ValueError as e:
+        # e.g. a non-numeric port or an unclosed IPv6 bracket; never becomes a cache key
+        raise HTTPException(status_code=422, detail=f"Invalid URL: {e}")
+
+
+async def scrape_cached(url: str) -> ScrapeResult:
+    url = cache_key(url)
+    return await scrape_cache.get_or_fetch(url, lambda: fetch_and_extract(url))
+
+
+async def scrape_in_batch(url: str) -> ScrapeResult:
+    """scrape_cached under the shared batch limit.
+
+    The shop's own slot is taken first: a task queued behind a busy host must not sit
+    on a batch slot that scrapes of other hosts could use. Both are taken inside the
+    cached fetch, so cached and in-flight URLs skip them and the slots belong to the
+    fetch task, not to a caller that may be cancelled.
+    """
+    url = cache_key(url)
+
+    async def fetch():
+        async with scraper_client.host_slot(url):
+            async with batch_slots:
+                return await fetch_and_extract(url)
+
+    return await scrape_cache.get_or_fetch(url, fetch)
 
 
 @router.post("/", response_model=ScrapeResult)
 async def scrape_url(data: ScrapeRequest):
-    url = data.url.strip()
-    if not url.startswith(("http://", "https://")):
-        url = "https://" + url
+    return await scrape_cached(data.url)
 
+
+async def _batch_entry(index: int, url: str) -> dict:
     try:
-        async with httpx.AsyncClient(headers=HEADERS, follow_redirects=True, timeout=15) as client:
-            resp = await client.get(url)
-            resp.raise_for_status()
-    except Exception as e:
-        raise HTTPException(status_code=422, detail=f"Could not fetch URL: {str(e)}")
-
-    soup = BeautifulSoup(resp.text, "lxml")
-
-    # Name
-    name = (
-        get_og_meta(soup, "title")
-        or (soup.find("title").get_text(strip=True) if soup.find("title") else None)
-        or soup.find("h1").get_text(strip=True) if soup.find("h1") else None
-    )
-    # Clean up name
-    if name:
-        name = re.sub(r"\s+", " ", name).strip()[:300]
-
-    # Image
-    image_url = (
-        get_og_meta(soup, "image")
-        or get_og_meta(soup, "image:url")
-    )
-
-    # Price — try multiple strategies
-    price = None
-
-    # 1. JSON-LD
-    for script in soup.find_all("script", type="application/ld+json"):
-        text = script.get_text()
-        price_match = re.search(r'"price":\s*"?([\d,.]+)"?', text)
-        if price_match:
-            price = extract_price(price_match.group(1))
-            if price:
-                break
-
-    # 2. Meta tags
-    if not price:
-        for prop in ["product:price:amount", "og:price:amount"]:
-            tag = soup.find("meta", property=prop) or soup.find("meta", attrs={"name": prop})
-            if tag:
-                price = extract_price(tag.get("content", ""))
-                if price:
-                    break
-
-    # 3. Common price selectors
-    if not price:
-        price_selectors = [
-            '[class*="price"]', '[class*="Price"]', '[data-price]',
-            '[itemprop="price"]', '.product-price', '#priceblock_ourprice',
-        ]
-        for selector in price_selectors:
-            el = soup.select_one(selector)
-            if el:
-                price = extract_price(el.get_text())
-                if price:
-                    break
-
-    description = get_og_meta(soup, "description")
-    if description:
-        description = description[:500]
-
-    return ScrapeResult(
-        name=name,
-        price=price,
-        image_url=image_url,
-        description=description,
-    )
+        result = await scrape_in_batch(url)
+    except HTTPException as e:
+        return {"index": index, "url": url, "ok": False, "error": e.detail}
+    except Exception:
+        # One broken page must not end the stream for the rest of the batch
+        return {"index": index, "url": url, "ok": False, "error": "Could not parse page"}
+    return {"index": index, "url": url, "ok": True, "result": result.model_dump(mode="json")}
+
+
+@router.post("/batch")
+async def scrape_batch(data: BatchScrapeRequest):
+    async def results():
+        tasks = [asyncio.create_task(_batch_entry(i, url)) for i, url in enumerate(data.urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield json.dumps(await next_done, ensure_ascii=False) + "\n"
+        finally:
+            # Client went away — stop fetching what's left
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
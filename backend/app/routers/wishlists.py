@@ -1,15 +1,40 @@
 import re
 import uuid
-from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload, selectinload
 from .. import models, schemas
+from ..config import settings
 from ..database import get_db
-from ..auth import require_user, get_current_user
+from ..auth import Principal, get_current_principal, require_principal
+from ..pagination import decode_cursor, encode_cursor
+from ..pubsub import bus
+from ..revisions import bump_revision
+from ..thumbnails import thumbnail_urls
+from ..wishlist_cache import wishlist_cache
 
 router = APIRouter(prefix="/wishlists", tags=["wishlists"])
 
 
+def wishlist_etag(revision: int, variant: str) -> str:
+    # Weak: the same revision renders differently for the owner and for guests
+    return f'W/"{revision}-{variant}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    return if_none_match.strip() == "*" or etag in (tag.strip() for tag in if_none_match.split(","))
+
+
+def wishlist_response(body: bytes | None, etag: str, if_none_match: str | None) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    if body is None or etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
 def make_slug(title: str, db: Session) -> str:
     base = re.sub(r"[^a-zA-Zа-яА-Я0-9\s]", "", title).strip()
     base = re.sub(r"\s+", "-", base).lower()
@@ -34,7 +59,7 @@ def make_slug(title: str, db: Session) -> str:
 
 
 def build_item_out(item: models.Item, is_owner: bool) -> schemas.ItemOut:
-    total = sum(c.amount for c in item.contributions) if item.contributions else Decimal("0")
+    # Only guests see contributor names, so owners' views never need the contributions loaded
     contributors = [
         schemas.ContributionInfo(contributor_name=c.contributor_name, created_at=c.created_at)
         for c in item.contributions
@@ -47,31 +72,49 @@ def build_item_out(item: models.Item, is_owner: bool) -> schemas.ItemOut:
         url=item.url,
         price=item.price,
         image_url=item.image_url,
+        thumbnails=thumbnail_urls(item.image_digest),
         description=item.description,
         priority=item.priority,
         is_group_gift=item.is_group_gift,
         target_amount=item.target_amount,
         is_deleted=item.is_deleted,
         created_at=item.created_at,
-        is_reserved=bool(item.reservation and not item.reservation.is_cancelled),
-        total_contributed=total,
-        contributors_count=len(item.contributions),
+        is_reserved=item.is_reserved,
+        total_contributed=item.contributed_total,
+        contributors_count=item.contributors_count,
         contributors=contributors,
     )
 
 
-@router.get("/", response_model=list[schemas.WishlistOut])
+@router.get("/", response_model=schemas.WishlistPage)
 def list_wishlists(
+    limit: int | None = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: str | None = None,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    user: Principal = Depends(require_principal),
 ):
-    wishlists = (
-        db.query(models.Wishlist)
-        .filter(models.Wishlist.user_id == user.id)
-        .options(joinedload(models.Wishlist.items))
-        .order_by(models.Wishlist.created_at.desc())
-        .all()
+    Wishlist = models.Wishlist
+    query = (
+        db.query(Wishlist)
+        .filter(Wishlist.user_id == user.id)
+        .order_by(Wishlist.created_at.desc(), Wishlist.id.desc())
     )
+    next_cursor = None
+    if limit is None and cursor is None:
+        wishlists = query.all()
+    else:
+        # Keyset: continue strictly after the last (created_at, id) seen, so inserts can't shift pages
+        if cursor:
+            created_at, wl_id = decode_cursor(cursor, datetime, str)
+            query = query.filter(or_(
+                Wishlist.created_at < created_at,
+                and_(Wishlist.created_at == created_at, Wishlist.id < wl_id),
+            ))
+        limit = limit or settings.PAGE_SIZE_DEFAULT
+        wishlists = query.limit(limit + 1).all()
+        if len(wishlists) > limit:
+            wishlists = wishlists[:limit]
+            next_cursor = encode_cursor(wishlists[-1].created_at, wishlists[-1].id)
     result = []
     for wl in wishlists:
         out = schemas.WishlistOut(
@@ -84,17 +127,17 @@ def list_wishlists(
             is_public=wl.is_public,
             created_at=wl.created_at,
             updated_at=wl.updated_at,
-            item_count=len([i for i in wl.items if not i.is_deleted]),
+            item_count=wl.active_item_count,
         )
         result.append(out)
-    return result
+    return schemas.WishlistPage(wishlists=result, next_cursor=next_cursor)
 
 
 @router.post("/", response_model=schemas.WishlistOut, status_code=201)
 def create_wishlist(
     data: schemas.WishlistCreate,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    user: Principal = Depends(require_principal),
 ):
     slug = make_slug(data.title, db)
     wl = models.Wishlist(
@@ -122,22 +165,13 @@ def create_wishlist(
     )
 
 
-@router.get("/{slug}", response_model=schemas.WishlistWithItems)
-def get_wishlist(
-    slug: str,
-    db: Session = Depends(get_db),
-    user: models.User = Depends(get_current_user),
-):
+def load_wishlist(
+    slug: str, db: Session, user: Principal | None, limit: int | None = None, cursor: str | None = None
+) -> schemas.WishlistWithItems:
     wl = (
         db.query(models.Wishlist)
         .filter(models.Wishlist.slug == slug)
-        .options(
-            joinedload(models.Wishlist.items)
-            .joinedload(models.Item.reservation),
-            joinedload(models.Wishlist.items)
-            .joinedload(models.Item.contributions),
-            joinedload(models.Wishlist.owner),
-        )
+        .options(joinedload(models.Wishlist.owner))
         .first()
     )
     if not wl:
@@ -146,11 +180,33 @@ def get_wishlist(
         raise HTTPException(status_code=403, detail="This wishlist is private")
 
     is_owner = bool(user and user.id == wl.user_id)
-    items = [
-        build_item_out(item, is_owner)
-        for item in sorted(wl.items, key=lambda i: (-i.priority, i.created_at))
-        if not item.is_deleted
-    ]
+    # Counters live on the item rows; only guests need contributor names, fetched in one IN query
+    Item = models.Item
+    query = (
+        db.query(Item)
+        .filter(Item.wishlist_id == wl.id, Item.is_deleted == False)
+        .order_by(Item.priority.desc(), Item.created_at, Item.id)
+    )
+    if not is_owner:
+        query = query.options(selectinload(Item.contributions))
+    next_cursor = None
+    if limit is None:
+        rows = query.all()
+    else:
+        if cursor:
+            priority, created_at, item_id = decode_cursor(cursor, int, datetime, str)
+            query = query.filter(or_(
+                Item.priority < priority,
+                and_(Item.priority == priority, or_(
+                    Item.created_at > created_at,
+                    and_(Item.created_at == created_at, Item.id > item_id),
+                )),
+            ))
+        rows = query.limit(limit + 1).all()
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].priority, rows[-1].created_at, rows[-1].id)
+    items = [build_item_out(item, is_owner) for item in rows]
 
     return schemas.WishlistWithItems(
         id=wl.id,
@@ -162,9 +218,99 @@ def get_wishlist(
         is_public=wl.is_public,
         created_at=wl.created_at,
         updated_at=wl.updated_at,
-        item_count=len(items),
+        item_count=len(items) if limit is None else wl.active_item_count,
         items=items,
         owner_name=wl.owner.name if wl.owner else "",
+        revision=wl.revision,
+        next_cursor=next_cursor,
+    )
+
+
+@router.get("/{slug}", response_model=schemas.WishlistWithItems)
+def get_wishlist(
+    slug: str,
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=settings.PAGE_SIZE_MAX),
+    cursor: str | None = None,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+):
+    if limit is not None or cursor is not None:
+        # Pages are neither cached nor ETagged; only the full list is
+        return load_wishlist(slug, db, user, limit or settings.PAGE_SIZE_DEFAULT, cursor)
+
+    if_none_match = request.headers.get("if-none-match")
+    cached = wishlist_cache.get(slug)
+    if cached is not None:
+        is_owner = bool(user and user.id == cached.owner_id)
+        if not cached.is_public and not is_owner:
+            raise HTTPException(status_code=403, detail="This wishlist is private")
+        variant = "owner" if is_owner else "guest"
+        etag = wishlist_etag(cached.revision, variant)
+        body = cached.bodies.get(variant)
+        if body is not None or etag_matches(if_none_match, etag):
+            wishlist_cache.record(hit=True)
+            return wishlist_response(body, etag, if_none_match)
+
+    wishlist_cache.record(hit=False)
+    since = wishlist_cache.version()
+    if if_none_match:
+        # Revalidation only needs the revision, not a full render
+        head = (
+            db.query(models.Wishlist.user_id, models.Wishlist.is_public, models.Wishlist.revision)
+            .filter(models.Wishlist.slug == slug)
+            .first()
+        )
+        if head:
+            is_owner = bool(user and user.id == head.user_id)
+            etag = wishlist_etag(head.revision, "owner" if is_owner else "guest")
+            if (head.is_public or is_owner) and etag_matches(if_none_match, etag):
+                return wishlist_response(None, etag, if_none_match)
+
+    out = load_wishlist(slug, db, user)
+    body = out.model_dump_json().encode()
+    variant = "owner" if user and user.id == out.user_id else "guest"
+    wishlist_cache.put(slug, out.user_id, out.is_public, out.revision, variant, body, since)
+    return wishlist_response(body, wishlist_etag(out.revision, variant), if_none_match)
+
+
+@router.get("/{slug}/changes", response_model=schemas.WishlistChanges)
+def get_wishlist_changes(
+    slug: str,
+    since: int = Query(ge=0),
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_principal),
+):
+    wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
+    if not wl:
+        raise HTTPException(status_code=404, detail="Wishlist not found")
+    if not wl.is_public and (not user or user.id != wl.user_id):
+        raise HTTPException(status_code=403, detail="This wishlist is private")
+    if since > wl.revision:
+        raise HTTPException(status_code=400, detail="Unknown revision, reload the wishlist")
+    if since < wl.compacted_revision:
+        # Removals up to here were archived, so the delta can't list them
+        raise HTTPException(status_code=410, detail="Revision too old, reload the wishlist")
+
+    is_owner = bool(user and user.id == wl.user_id)
+    query = (
+        db.query(models.Item)
+        .filter(models.Item.wishlist_id == wl.id, models.Item.updated_revision > since)
+        .order_by(models.Item.priority.desc(), models.Item.created_at)
+    )
+    if not is_owner:
+        query = query.options(selectinload(models.Item.contributions))
+    changed = query.all()
+
+    return schemas.WishlistChanges(
+        revision=wl.revision,
+        wishlist=schemas.WishlistOut(
+            id=wl.id, user_id=wl.user_id, title=wl.title, description=wl.description,
+            cover_emoji=wl.cover_emoji, slug=wl.slug, is_public=wl.is_public,
+            created_at=wl.created_at, updated_at=wl.updated_at, item_count=wl.active_item_count,
+        ),
+        items=[build_item_out(item, is_owner) for item in changed if not item.is_deleted],
+        removed_item_ids=[item.id for item in changed if item.is_deleted],
     )
 
 
@@ -173,7 +319,7 @@ def update_wishlist(
     slug: str,
     data: schemas.WishlistUpdate,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    user: Principal = Depends(require_principal),
 ):
     wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
     if not wl:
@@ -183,17 +329,17 @@ def update_wishlist(
 
     for field, value in data.model_dump(exclude_none=True).items():
         setattr(wl, field, value)
+    db.execute(bump_revision(wl.id))
 
     db.commit()
     db.refresh(wl)
-    items_count = db.query(models.Item).filter(
-        models.Item.wishlist_id == wl.id, models.Item.is_deleted == False
-    ).count()
+    wishlist_cache.invalidate(slug)
+    bus.publish(slug, None)
 
     return schemas.WishlistOut(
         id=wl.id, user_id=wl.user_id, title=wl.title, description=wl.description,
         cover_emoji=wl.cover_emoji, slug=wl.slug, is_public=wl.is_public,
-        created_at=wl.created_at, updated_at=wl.updated_at, item_count=items_count,
+        created_at=wl.created_at, updated_at=wl.updated_at, item_count=wl.active_item_count,
     )
 
 
@@ -201,7 +347,7 @@ def update_wishlist(
 def delete_wishlist(
     slug: str,
     db: Session = Depends(get_db),
-    user: models.User = Depends(require_user),
+    user: Principal = Depends(require_principal),
 ):
     wl = db.query(models.Wishlist).filter(models.Wishlist.slug == slug).first()
     if not wl:
@@ -210,3 +356,5 @@ def delete_wishlist(
         raise HTTPException(status_code=403, detail="Forbidden")
     db.delete(wl)
     db.commit()
+    wishlist_cache.invalidate(slug)
+    bus.publish(slug, None)
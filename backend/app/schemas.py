@@ -2,6 +2,7 @@ from pydantic import BaseModel, EmailStr, field_validator
 from typing import Optional
 from datetime import datetime
 from decimal import Decimal
+from .config import settings
 
 
 # Auth
@@ -83,6 +84,21 @@ class ItemCreate(BaseModel):
     target_amount: Optional[Decimal] = None
 
 
+class ItemBulkCreate(BaseModel):
+    items: list[ItemCreate]
+    # Fill in price / image / description from the item's URL where they are missing
+    autofill: bool = False
+
+    @field_validator("items")
+    @classmethod
+    def items_limit(cls, v):
+        if not v:
+            raise ValueError("At least one item is required")
+        if len(v) > settings.ITEM_BULK_MAX_ITEMS:
+            raise ValueError(f"At most {settings.ITEM_BULK_MAX_ITEMS} items per request")
+        return v
+
+
 class ItemUpdate(BaseModel):
     name: Optional[str] = None
     url: Optional[str] = None
@@ -102,6 +118,12 @@ class ContributionInfo(BaseModel):
         from_attributes = True
 
 
+class ThumbnailOut(BaseModel):
+    width: int
+    webp: str
+    jpg: str
+
+
 class ItemOut(BaseModel):
     id: str
     wishlist_id: str
@@ -109,6 +131,7 @@ class ItemOut(BaseModel):
     url: Optional[str] = None
     price: Optional[Decimal] = None
     image_url: Optional[str] = None
+    thumbnails: list[ThumbnailOut] = []
     description: Optional[str] = None
     priority: int
     is_group_gift: bool
@@ -126,14 +149,28 @@ class ItemOut(BaseModel):
         from_attributes = True
 
 
+class WishlistPage(BaseModel):
+    wishlists: list[WishlistOut] = []
+    next_cursor: Optional[str] = None  # set on paginated reads when more wishlists follow
+
+
 class WishlistWithItems(WishlistOut):
     items: list[ItemOut] = []
     owner_name: str = ""
+    revision: int = 0
+    next_cursor: Optional[str] = None  # set on paginated reads when more items follow
 
     class Config:
         from_attributes = True
 
 
+class WishlistChanges(BaseModel):
+    revision: int
+    wishlist: WishlistOut
+    items: list[ItemOut] = []  # added or changed since the requested revision
+    removed_item_ids: list[str] = []
+
+
 # Reservations
 class ReserveItem(BaseModel):
     reserver_name: str
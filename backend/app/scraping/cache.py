@@ -0,0 +1,130 @@
+import asyncio
+import contextvars
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, NamedTuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from fastapi import HTTPException
+from ..config import settings
+from ..schemas import ScrapeResult
+
+TRACKING_PARAMS = {
+    "gclid", "dclid", "fbclid", "yclid", "ysclid", "msclkid", "igshid",
+    "mc_cid", "mc_eid", "_openstat", "spm",
+}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    url = url.strip()
+    if not url.lower().startswith(("http://", "https://")):
+        url = "https://" + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if ":" in host:
+        host = f"[{host}]"
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = [
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_") and k.lower() not in TRACKING_PARAMS
+    ]
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+class CachedFailure(NamedTuple):
+    status_code: int
+    detail: str
+
+    def exception(self) -> HTTPException:
+        # A fresh one per raise: a shared instance would pile up tracebacks across requests
+        return HTTPException(status_code=self.status_code, detail=self.detail)
+
+
+class ScrapeCache:
+    """LRU + TTL cache of scrape results that also coalesces concurrent fetches of one URL."""
+
+    def __init__(self, max_size: int, ttl: float, negative_ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # key -> (expires_at, ScrapeResult | CachedFailure)
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def _lookup(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key: str, value, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def _run(self, key: str, fetch: Callable[[], Awaitable[ScrapeResult]]) -> ScrapeResult:
+        try:
+            result = await fetch()
+        except HTTPException as e:
+            # Failed fetches are cached briefly so a dead link isn't hammered
+            if e.status_code == 422:
+                self._store(key, CachedFailure(e.status_code, e.detail), self.negative_ttl)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self._store(key, result, self.ttl)
+        return result
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[ScrapeResult]]) -> ScrapeResult:
+        cached = self._lookup(key)
+        if isinstance(cached, CachedFailure):
+            self.negative_hits += 1
+            raise cached.exception()
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            # Own context: the fetch outlives its caller, so it must not inherit the caller's held host slots
+            task = self._inflight[key] = asyncio.create_task(self._run(key, fetch), context=contextvars.Context())
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            self.coalesced += 1
+        # Shielded so one client disconnecting doesn't cancel the fetch others wait on
+        return await asyncio.shield(task)
+
+    def snapshot(self) -> dict:
+        lookups = self.hits + self.negative_hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "inflight": len(self._inflight),
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_ratio": round((self.hits + self.negative_hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+        }
+
+
+scrape_cache = ScrapeCache(
+    max_size=settings.SCRAPE_CACHE_SIZE,
+    ttl=settings.SCRAPE_CACHE_TTL,
+    negative_ttl=settings.SCRAPE_CACHE_NEGATIVE_TTL,
+)
@@ -0,0 +1,157 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from urllib.parse import urlsplit
+import httpx
+from ..config import settings
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Accept-Language": "ru-RU,ru;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+# Hosts whose slot the current task already holds, so nested requests to them don't wait twice
+_held_hosts: ContextVar[frozenset[str]] = ContextVar("scraper_held_hosts", default=frozenset())
+
+
+class PoolStats:
+    def __init__(self):
+        self.requests = 0
+        self.pool_hits = 0
+        self.pool_misses = 0
+        self.http2_requests = 0
+        self.connect_time_total = 0.0
+        self.tls_time_total = 0.0
+        self.host_limit_waits = 0
+        self.download_limit_waits = 0
+
+    def snapshot(self) -> dict:
+        misses = self.pool_misses
+        return {
+            "requests": self.requests,
+            "pool_hits": self.pool_hits,
+            "pool_misses": misses,
+            "hit_ratio": round(self.pool_hits / self.requests, 4) if self.requests else 0.0,
+            "http2_requests": self.http2_requests,
+            "avg_connect_ms": round(self.connect_time_total / misses * 1000, 2) if misses else 0.0,
+            "avg_tls_ms": round(self.tls_time_total / misses * 1000, 2) if misses else 0.0,
+            "host_limit_waits": self.host_limit_waits,
+            "download_limit_waits": self.download_limit_waits,
+        }
+
+
+class ScraperClient:
+    """One long-lived httpx client shared by every scrape, owned by the app lifespan."""
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+        # host -> [semaphore, users]; entries are dropped once nobody holds them
+        self._hosts: dict[str, list] = {}
+        # Taken after the host slot, so a queue for one shop never holds a download slot
+        self._downloads = asyncio.Semaphore(settings.SCRAPER_MAX_DOWNLOADS)
+        self.stats = PoolStats()
+
+    def _build(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers=HEADERS,
+            follow_redirects=True,
+            timeout=settings.SCRAPER_TIMEOUT,
+            http2=settings.SCRAPER_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.SCRAPER_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.SCRAPER_MAX_KEEPALIVE,
+                keepalive_expiry=settings.SCRAPER_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def start(self):
+        if self._client is None:
+            self._client = self._build()
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        # Lazily created so scripts that skip the lifespan still get a pooled client
+        if self._client is None:
+            self._client = self._build()
+        return self._client
+
+    @asynccontextmanager
+    async def host_slot(self, url: str):
+        host = (urlsplit(url).hostname or "").lower()
+        held = _held_hosts.get()
+        if host in held:
+            yield
+            return
+        entry = self._hosts.get(host)
+        if entry is None:
+            entry = self._hosts[host] = [asyncio.Semaphore(settings.SCRAPER_PER_HOST_CONNECTIONS), 0]
+        entry[1] += 1
+        sem = entry[0]
+        if sem.locked():
+            self.stats.host_limit_waits += 1
+        try:
+            async with sem:
+                token = _held_hosts.set(held | {host})
+                try:
+                    yield
+                finally:
+                    _held_hosts.reset(token)
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                self._hosts.pop(host, None)
+
+    def _tracer(self):
+        started: dict = {}
+
+        async def trace(name: str, info: dict):
+            stats = self.stats
+            if name.endswith(".send_request_headers.started"):
+                stats.requests += 1
+                if name.startswith("http2."):
+                    stats.http2_requests += 1
+                if not started.pop("fresh", False):
+                    stats.pool_hits += 1
+            elif name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+                started[name] = time.perf_counter()
+            elif name == "connection.connect_tcp.complete":
+                stats.pool_misses += 1
+                stats.connect_time_total += time.perf_counter() - started.pop("connection.connect_tcp.started")
+                started["fresh"] = True
+            elif name == "connection.start_tls.complete":
+                stats.tls_time_total += time.perf_counter() - started.pop("connection.start_tls.started")
+
+        return trace
+
+    @asynccontextmanager
+    async def _download_slot(self, url: str):
+        async with self.host_slot(url):
+            if self._downloads.locked():
+                self.stats.download_limit_waits += 1
+            async with self._downloads:
+                yield
+
+    async def get(self, url: str) -> httpx.Response:
+        async with self._download_slot(url):
+            return await self.client.get(url, extensions={"trace": self._tracer()})
+
+    @asynccontextmanager
+    async def stream(self, url: str, headers: dict | None = None):
+        async with self._download_slot(url):
+            async with self.client.stream(
+                "GET", url, headers=headers, extensions={"trace": self._tracer()}
+            ) as resp:
+                yield resp
+
+
+scraper_client = ScraperClient()
@@ -0,0 +1,166 @@
+import re
+from decimal import Decimal
+from bs4 import BeautifulSoup
+from lxml import etree
+from ..config import settings
+from ..schemas import ScrapeResult
+from .rules import GENERIC, ExtractionRule
+
+PRICE_NUMBER_RE = re.compile(r"[\d\s,]+\.?\d*")
+PRICE_SEPARATORS_RE = re.compile(r"[\s,]")
+WHITESPACE_RE = re.compile(r"\s+")
+# Elements whose text we still need when they close, so their children must survive until then
+TEXT_TAGS = ("title", "h1")
+
+
+def extract_price(text: str) -> Decimal | None:
+    # Find first number that looks like a price
+    for m in PRICE_NUMBER_RE.finditer(text):
+        cleaned = PRICE_SEPARATORS_RE.sub("", m.group()).replace(",", ".")
+        try:
+            val = Decimal(cleaned)
+            if val > 0:
+                return val
+        except Exception:
+            continue
+    return None
+
+
+def find_price_by_selectors(soup: BeautifulSoup, rule: ExtractionRule = GENERIC) -> Decimal | None:
+    for selector in rule.compiled_selectors:
+        el = selector.select_one(soup)
+        if el:
+            price = extract_price(el.get_text())
+            if price:
+                return price
+    return None
+
+
+class StreamingExtractor:
+    """Incremental OG / JSON-LD / meta extraction over a response body fed chunk by chunk.
+
+    `feed` returns True once name, image and a structured price are known (or the byte
+    cap is hit), so the caller can stop downloading. Only when no structured price was
+    found does `result` build a full soup over the buffered bytes for the selector search.
+    """
+
+    def __init__(self, encoding: str | None = None, max_bytes: int | None = None, rule: ExtractionRule = GENERIC):
+        self.encoding = encoding
+        self.rule = rule
+        self.max_bytes = max_bytes or settings.SCRAPER_MAX_BYTES
+        # Created on first use so it lives on the thread that does the parsing
+        self._parser = None
+        self._buffer = bytearray()
+        self._keep_depth = 0
+        self._head_closed = False
+        self.truncated = False
+        self.meta: dict[str, str] = {}
+        self.title: str | None = None
+        self.h1: str | None = None
+        self.jsonld_price: Decimal | None = None
+
+    @property
+    def bytes_read(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def meta_price(self) -> Decimal | None:
+        for prop in self.rule.price_meta:
+            if prop in self.meta:
+                price = extract_price(self.meta[prop])
+                if price:
+                    return price
+        return None
+
+    @property
+    def complete(self) -> bool:
+        has_name = "og:title" in self.meta or (self._head_closed and bool(self.title or self.h1))
+        has_image = "og:image" in self.meta or "og:image:url" in self.meta
+        has_price = self.jsonld_price is not None or self.meta_price is not None
+        return has_name and has_image and has_price
+
+    @property
+    def parser(self) -> etree.HTMLPullParser:
+        if self._parser is None:
+            self._parser = etree.HTMLPullParser(events=("start", "end"), encoding=self.encoding)
+        return self._parser
+
+    def feed(self, chunk: bytes) -> bool:
+        room = self.max_bytes - len(self._buffer)
+        if len(chunk) >= room:
+            chunk = chunk[:room]
+            self.truncated = True
+        self._buffer.extend(chunk)
+        self.parser.feed(chunk)
+        self._drain()
+        return self.truncated or self.complete
+
+    def _drain(self):
+        for event, el in self.parser.read_events():
+            tag = el.tag
+            if not isinstance(tag, str):
+                continue
+            if event == "start":
+                if tag in TEXT_TAGS:
+                    self._keep_depth += 1
+                continue
+
+            if tag == "meta":
+                key = el.get("property") or el.get("name") or el.get("itemprop")
+                content = el.get("content")
+                if key and content is not None and key not in self.meta:
+                    self.meta[key] = content
+            elif tag == "title":
+                self._keep_depth -= 1
+                if self.title is None:
+                    self.title = "".join(el.itertext())
+            elif tag == "h1":
+                self._keep_depth -= 1
+                if self.h1 is None:
+                    self.h1 = "".join(el.itertext())
+            elif (
+                tag == "script" and self.rule.jsonld_price and self.jsonld_price is None
+                and el.get("type") == "application/ld+json"
+            ):
+                price_match = self.rule.jsonld_price_re.search(el.text or "")
+                if price_match:
+                    self.jsonld_price = extract_price(price_match.group(1))
+            elif tag == "head":
+                self._head_closed = True
+
+            # Drop finished subtrees so the in-memory tree stays tiny
+            if tag not in ("html", "head", "body") and not self._keep_depth:
+                el.clear()
+                parent = el.getparent()
+                if parent is not None:
+                    while el.getprevious() is not None:
+                        del parent[0]
+
+    def result(self) -> ScrapeResult:
+        try:
+            self.parser.close()
+        except etree.XMLSyntaxError:
+            pass
+        self._drain()
+
+        name = self.meta.get("og:title") or self.title or self.h1
+        if name:
+            name = WHITESPACE_RE.sub(" ", name).strip()[:300] or None
+
+        image_url = self.meta.get("og:image") or self.meta.get("og:image:url")
+
+        price = self.jsonld_price or self.meta_price
+        if not price:
+            soup = BeautifulSoup(bytes(self._buffer), "lxml", from_encoding=self.encoding)
+            price = find_price_by_selectors(soup, self.rule)
+
+        description = self.meta.get("og:description")
+        if description:
+            description = description[:500]
+
+        return ScrapeResult(
+            name=name,
+            price=price,
+            image_url=image_url,
+            description=description,
+        )
@@ -0,0 +1,87 @@
+import re
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+import soupsieve
+
+
+@dataclass
+class ExtractionRule:
+    """How to find a price on one shop's pages.
+
+    Selectors and regexes are compiled once when the rule is registered, so the
+    per-request work is only running them. Adding a shop means adding a rule here.
+    """
+
+    name: str
+    hosts: tuple[str, ...] = ()
+    # Structured sources, tried before any selector
+    jsonld_price: bool = True
+    price_meta: tuple[str, ...] = ("product:price:amount", "og:price:amount")
+    # Selector fallback, tried in order on the full page
+    price_selectors: tuple[str, ...] = ()
+    jsonld_price_pattern: str = r'"price":\s*"?([\d,.]+)"?'
+
+    compiled_selectors: list = field(init=False, repr=False)
+    jsonld_price_re: re.Pattern = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.compiled_selectors = [soupsieve.compile(s) for s in self.price_selectors]
+        self.jsonld_price_re = re.compile(self.jsonld_price_pattern)
+
+
+GENERIC = ExtractionRule(
+    name="generic",
+    price_selectors=(
+        '[class*="price"]', '[class*="Price"]', '[data-price]',
+        '[itemprop="price"]', '.product-price', '#priceblock_ourprice',
+    ),
+)
+
+_rules_by_host: dict[str, ExtractionRule] = {}
+
+
+def register(rule: ExtractionRule) -> ExtractionRule:
+    for host in rule.hosts:
+        _rules_by_host[host] = rule
+    return rule
+
+
+def rule_for(url: str) -> ExtractionRule:
+    host = (urlsplit(url).hostname or "").lower()
+    # www.ozon.ru -> ozon.ru -> ru: the most specific registered suffix wins
+    while host:
+        rule = _rules_by_host.get(host)
+        if rule is not None:
+            return rule
+        _, _, host = host.partition(".")
+    return GENERIC
+
+
+register(ExtractionRule(
+    name="ozon",
+    hosts=("ozon.ru", "ozon.kz", "ozon.by"),
+    price_selectors=('[data-widget="webPrice"]', '[data-widget="webSale"]'),
+))
+
+register(ExtractionRule(
+    name="wildberries",
+    hosts=("wildberries.ru", "wb.ru", "wildberries.kz", "wildberries.by"),
+    jsonld_price=False,
+    price_meta=("price", "product:price:amount"),
+    price_selectors=(".price-block__final-price", ".price-block__wallet-price", '[itemprop="price"]'),
+))
+
+register(ExtractionRule(
+    name="amazon",
+    hosts=(
+        "amazon.com", "amazon.de", "amazon.co.uk", "amazon.fr", "amazon.it", "amazon.es",
+        "amazon.ca", "amazon.in", "amazon.co.jp", "amazon.com.tr", "amazon.ae",
+    ),
+    jsonld_price=False,
+    price_selectors=(
+        "#corePrice_feature_div .a-offscreen",
+        "#corePriceDisplay_desktop_feature_div .a-offscreen",
+        "#priceblock_ourprice", "#priceblock_dealprice",
+        ".a-price .a-offscreen",
+    ),
+))
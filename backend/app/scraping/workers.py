@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from ..config import settings
+
+
+class ParsePoolFull(Exception):
+    pass
+
+
+class ParseStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.jobs = 0
+        self.rejected = 0
+        self.parse_time_total = 0.0
+        self.parse_time_max = 0.0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+
+    def reject(self):
+        with self._lock:
+            self.rejected += 1
+
+    def record(self, queue_wait: float, parse_time: float):
+        with self._lock:
+            self.jobs += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.parse_time_total += parse_time
+            self.parse_time_max = max(self.parse_time_max, parse_time)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            jobs = self.jobs
+            return {
+                "jobs": jobs,
+                "rejected": self.rejected,
+                "avg_parse_ms": round(self.parse_time_total / jobs * 1000, 2) if jobs else 0.0,
+                "max_parse_ms": round(self.parse_time_max * 1000, 2),
+                "avg_queue_wait_ms": round(self.queue_wait_total / jobs * 1000, 2) if jobs else 0.0,
+                "max_queue_wait_ms": round(self.queue_wait_max * 1000, 2),
+            }
+
+
+class ParsePool:
+    """Bounded set of parse threads that keeps HTML parsing off the event loop.
+
+    lxml parsers must stay on the thread that created them, so the pool is made of
+    single-thread lanes and every job of one scrape runs on the lane it was given.
+    At most `max_scrapes` scrapes are admitted at once, downloads included. Parse
+    jobs have their own bound: once `workers + queue_limit` are queued or running,
+    the next one fails instead of queueing behind them.
+    """
+
+    def __init__(self, workers: int, queue_limit: int, max_scrapes: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.max_scrapes = max_scrapes
+        self._lanes: list[ThreadPoolExecutor] | None = None
+        self._lane_load = [0] * workers
+        self._queued = 0
+        self.stats = ParseStats()
+
+    def start(self):
+        if self._lanes is None:
+            self._lanes = [
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"scrape-parse-{i}")
+                for i in range(self.workers)
+            ]
+
+    def close(self):
+        if self._lanes is not None:
+            for lane in self._lanes:
+                lane.shutdown(wait=False, cancel_futures=True)
+            self._lanes = None
+
+    @contextmanager
+    def lane(self):
+        """Pin a scrape to the least busy lane; refused before anything is downloaded if the pool is backed up."""
+        if sum(self._lane_load) >= self.max_scrapes or self._queued >= self.workers + self.queue_limit:
+            self.stats.reject()
+            raise ParsePoolFull()
+        lane = min(range(self.workers), key=self._lane_load.__getitem__)
+        self._lane_load[lane] += 1
+        try:
+            yield lane
+        finally:
+            self._lane_load[lane] -= 1
+
+    async def run(self, lane: int, fn, *args):
+        self.start()
+        submitted = time.perf_counter()
+
+        def job():
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                self.stats.record(started - submitted, time.perf_counter() - started)
+
+        if self._queued >= self.workers + self.queue_limit:
+            self.stats.reject()
+            raise ParsePoolFull()
+        self._queued += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._lanes[lane], job)
+        finally:
+            self._queued -= 1
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "max_scrapes": self.max_scrapes,
+            "scrapes": sum(self._lane_load),
+            "queued": self._queued,
+            **self.stats.snapshot(),
+        }
+
+
+parse_pool = ParsePool(
+    workers=settings.SCRAPER_PARSE_WORKERS,
+    queue_limit=settings.SCRAPER_PARSE_QUEUE_LIMIT,
+    max_scrapes=settings.SCRAPER_MAX_SCRAPES,
+)
@@ -0,0 +1,181 @@
+import asyncio
+import hashlib
+import io
+import logging
+import os
+import uuid
+from pathlib import Path
+from PIL import Image, ImageOps
+from . import models
+from .config import settings
+from .database import SessionLocal
+from .revisions import bump_revision
+from .scraping.client import scraper_client
+from .websocket_manager import manager
+from .wishlist_cache import wishlist_cache
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpg": ("JPEG", "image/jpeg")}
+
+
+def thumbnail_path(digest: str, width: int, ext: str) -> Path:
+    return Path(settings.MEDIA_DIR) / "thumbs" / digest[:2] / digest / f"{width}.{ext}"
+
+
+def thumbnail_urls(digest: str | None) -> list[dict]:
+    if not digest:
+        return []
+    return [
+        {"width": w, **{ext: f"/images/{digest}/{w}.{ext}" for ext in FORMATS}}
+        for w in settings.THUMBNAIL_WIDTHS
+    ]
+
+
+def thumbnails_exist(digest: str) -> bool:
+    return all(thumbnail_path(digest, w, ext).is_file() for w in settings.THUMBNAIL_WIDTHS for ext in FORMATS)
+
+
+def render_thumbnails(data: bytes, digest: str):
+    """Decode once and write every width/format; files are content-addressed so reruns are no-ops."""
+    if thumbnails_exist(digest):
+        return
+    with Image.open(io.BytesIO(data)) as src:
+        # Let the JPEG decoder downscale while decoding; far cheaper than resizing a 2000px original
+        largest = max(settings.THUMBNAIL_WIDTHS)
+        src.draft("RGB", (largest, largest * 4))
+        # Other formats decode at full size, so refuse huge ones before anything is loaded
+        if src.width * src.height > settings.THUMBNAIL_MAX_PIXELS:
+            raise ValueError(f"Image is too large ({src.width}x{src.height})")
+        img = ImageOps.exif_transpose(src)
+        img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+        for width in sorted(settings.THUMBNAIL_WIDTHS, reverse=True):
+            w = min(width, img.width)
+            resized = img.resize((w, max(1, round(img.height * w / img.width))), Image.LANCZOS)
+            for ext, (fmt, _) in FORMATS.items():
+                out = resized.convert("RGB") if fmt == "JPEG" else resized
+                path = thumbnail_path(digest, width, ext)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # A name of its own, so concurrent renders of one digest never write the same file
+                tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+                try:
+                    out.save(tmp, fmt, quality=settings.THUMBNAIL_QUALITY, optimize=fmt == "JPEG")
+                    os.replace(tmp, path)
+                except BaseException:
+                    tmp.unlink(missing_ok=True)
+                    raise
+
+
+def known_digest(image_url: str) -> str | None:
+    """Digest of an image already processed for another item, if its thumbnails are on this disk."""
+    db = SessionLocal()
+    try:
+        row = (
+            db.query(models.Item.image_digest)
+            .filter(models.Item.image_url == image_url, models.Item.image_digest.isnot(None))
+            .first()
+        )
+    finally:
+        db.close()
+    # Media is local to each replica and gone after a redeploy; rendering again restores it
+    return row[0] if row and thumbnails_exist(row[0]) else None
+
+
+def store_digest(item_id: str, image_url: str, digest: str) -> tuple[str, dict] | None:
+    # Imported here: the wishlists router itself needs thumbnail_urls from this module
+    from .routers.wishlists import build_item_out
+
+    db = SessionLocal()
+    try:
+        item = db.get(models.Item, item_id)
+        # The image may have been replaced while we were fetching the old one
+        if item is None or item.image_url != image_url or item.is_deleted:
+            return None
+        if item.image_digest == digest:
+            # Restored files under the same name; nothing for clients to refetch
+            return None
+        item.image_digest = digest
+        item.updated_revision = db.execute(bump_revision(item.wishlist_id)).scalar_one()
+        db.commit()
+        db.refresh(item)
+        return item.wishlist.slug, build_item_out(item, True).model_dump(mode="json")
+    finally:
+        db.close()
+
+
+async def fetch_image(url: str) -> bytes:
+    async with scraper_client.stream(url) as resp:
+        resp.raise_for_status()
+        data = bytearray()
+        async for chunk in resp.aiter_bytes():
+            data.extend(chunk)
+            if len(data) > settings.THUMBNAIL_MAX_SOURCE_BYTES:
+                raise ValueError("Image is too large")
+    return bytes(data)
+
+
+class Thumbnailer:
+    def __init__(self):
+        self._tasks: set[asyncio.Task] = set()
+        self._restoring: set[str] = set()
+        self._slots = asyncio.Semaphore(settings.THUMBNAIL_CONCURRENCY)
+        self.generated = 0
+        self.reused = 0
+        self.failures = 0
+        self.restores = 0
+
+    def schedule(self, item_id: str, image_url: str | None) -> asyncio.Task | None:
+        if not image_url or not settings.THUMBNAILS_ENABLED:
+            return None
+        task = asyncio.create_task(self._process(item_id, image_url))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def restore(self, item_id: str, image_url: str):
+        """Render again thumbnails this replica was asked for but doesn't have; one job per image."""
+        if image_url in self._restoring:
+            return
+        task = self.schedule(item_id, image_url)
+        if task is not None:
+            self.restores += 1
+            self._restoring.add(image_url)
+            task.add_done_callback(lambda _: self._restoring.discard(image_url))
+
+    async def _process(self, item_id: str, image_url: str):
+        try:
+            digest = await asyncio.to_thread(known_digest, image_url)
+            if digest:
+                self.reused += 1
+            else:
+                async with self._slots:
+                    data = await fetch_image(image_url)
+                    digest = hashlib.sha256(data).hexdigest()
+                    await asyncio.to_thread(render_thumbnails, data, digest)
+                self.generated += 1
+            update = await asyncio.to_thread(store_digest, item_id, image_url, digest)
+        except Exception:
+            self.failures += 1
+            logger.warning("Thumbnail generation failed for %s", image_url, exc_info=True)
+            return
+        if update:
+            slug, item = update
+            wishlist_cache.invalidate(slug)
+            manager.broadcast(slug, {"type": "item_updated", "item": item})
+
+    async def stop(self):
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def snapshot(self) -> dict:
+        return {
+            "pending": len(self._tasks),
+            "generated": self.generated,
+            "reused": self.reused,
+            "restores": self.restores,
+            "failures": self.failures,
+        }
+
+
+thumbnailer = Thumbnailer()
@@ -1,36 +1,120 @@
+import asyncio
 import json
-from typing import Dict, Set
+import logging
+from typing import Dict
 from fastapi import WebSocket
+from .config import settings
+from .pubsub import bus
+from .wishlist_cache import wishlist_cache
+
+logger = logging.getLogger(__name__)
+
+# Policy violation is the closest standard code for "couldn't keep up"; clients reconnect and refetch
+SLOW_CONSUMER_CLOSE_CODE = 1008
+
+
+class Subscriber:
+    """One open socket: a bounded outbox drained by its own writer task."""
+
+    def __init__(self, manager: "ConnectionManager", websocket: WebSocket, slug: str):
+        self.websocket = websocket
+        self.slug = slug
+        self.outbox: asyncio.Queue[str] = asyncio.Queue(maxsize=settings.WS_SEND_QUEUE_SIZE)
+        self.writer = asyncio.create_task(self._write(manager))
+
+    async def _write(self, manager: "ConnectionManager"):
+        while True:
+            text = await self.outbox.get()
+            try:
+                await asyncio.wait_for(self.websocket.send_text(text), settings.WS_SEND_TIMEOUT)
+            except asyncio.TimeoutError:
+                manager.drop(self, "timeout")
+                return
+            except Exception:
+                manager.drop(self, "error")
+                return
+            manager.sent += 1
 
 
 class ConnectionManager:
     def __init__(self):
-        # wishlist_slug -> set of websockets
-        self.connections: Dict[str, Set[WebSocket]] = {}
+        # wishlist_slug -> websocket -> its subscriber
+        self.connections: Dict[str, Dict[WebSocket, Subscriber]] = {}
+        self.events = 0
+        self.sent = 0
+        self.dropped = {"timeout": 0, "backlog": 0, "error": 0}
+        self._closing: set[asyncio.Task] = set()
 
     async def connect(self, websocket: WebSocket, slug: str):
         await websocket.accept()
-        if slug not in self.connections:
-            self.connections[slug] = set()
-        self.connections[slug].add(websocket)
+        self.connections.setdefault(slug, {})[websocket] = Subscriber(self, websocket, slug)
 
     def disconnect(self, websocket: WebSocket, slug: str):
-        if slug in self.connections:
-            self.connections[slug].discard(websocket)
-            if not self.connections[slug]:
-                del self.connections[slug]
+        subscribers = self.connections.get(slug)
+        if subscribers is None:
+            return
+        subscriber = subscribers.pop(websocket, None)
+        if subscriber is not None:
+            subscriber.writer.cancel()
+        if not subscribers:
+            del self.connections[slug]
 
-    async def broadcast(self, slug: str, event: dict):
-        if slug not in self.connections:
+    def drop(self, subscriber: Subscriber, reason: str):
+        """Cut off a socket that fell behind or broke, without holding up anyone else."""
+        if self.connections.get(subscriber.slug, {}).get(subscriber.websocket) is not subscriber:
             return
-        dead = set()
-        for ws in self.connections[slug]:
+        self.dropped[reason] += 1
+        self.disconnect(subscriber.websocket, subscriber.slug)
+        if reason != "error":
+            logger.info("Dropping slow WebSocket consumer of %s (%s)", subscriber.slug, reason)
+            task = asyncio.create_task(self._close(subscriber.websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), settings.WS_SEND_TIMEOUT)
+        except Exception:
+            pass
+
+    def broadcast(self, slug: str, event: dict):
+        """Queue `event` for every socket watching `slug`, here and in the other processes; returns at once."""
+        text = json.dumps(event)
+        self.deliver(slug, text)
+        bus.publish(slug, text)
+
+    def receive_remote(self, slug: str, text: str | None):
+        """A change made by another process: its render of `slug` is stale here too."""
+        wishlist_cache.invalidate(slug)
+        if text is not None:
+            self.deliver(slug, text)
+
+    def resync(self):
+        """Events from other processes may have been missed: forget cached pages, have every viewer refetch."""
+        wishlist_cache.clear()
+        text = json.dumps({"type": "resync"})
+        for slug in list(self.connections):
+            self.deliver(slug, text)
+
+    def deliver(self, slug: str, text: str):
+        subscribers = self.connections.get(slug)
+        if not subscribers:
+            return
+        self.events += 1
+        for subscriber in list(subscribers.values()):
             try:
-                await ws.send_text(json.dumps(event))
-            except Exception:
-                dead.add(ws)
-        for ws in dead:
-            self.connections[slug].discard(ws)
+                subscriber.outbox.put_nowait(text)
+            except asyncio.QueueFull:
+                self.drop(subscriber, "backlog")
+
+    def snapshot(self) -> dict:
+        return {
+            "connections": sum(len(s) for s in self.connections.values()),
+            "wishlists": len(self.connections),
+            "events": self.events,
+            "sent": self.sent,
+            "dropped": dict(self.dropped),
+        }
 
 
 manager = ConnectionManager()
@@ -0,0 +1,112 @@
+import threading
+import time
+from collections import OrderedDict
+from .config import settings
+
+
+class CachedWishlist:
+    __slots__ = ("owner_id", "is_public", "revision", "bodies", "expires_at")
+
+    def __init__(self, owner_id: str, is_public: bool, revision: int, expires_at: float):
+        self.owner_id = owner_id
+        self.is_public = is_public
+        self.revision = revision
+        self.expires_at = expires_at
+        # "owner" / "guest" -> rendered WishlistWithItems JSON
+        self.bodies: dict[str, bytes] = {}
+
+
+class WishlistCache:
+    """LRU cache of rendered public wishlist pages, invalidated by slug on every mutation.
+
+    Readers call `version()` before touching the database and pass it back to `put`, so a
+    render that started before an invalidation can't store the stale page afterwards.
+    Entries also expire after `ttl` seconds, in case an invalidation from another process
+    never arrived.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedWishlist] = OrderedDict()
+        self._seq = 0
+        # slug -> seq of its last invalidation; bounded, `_forgotten` is the newest seq dropped from it
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._forgotten = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    def version(self) -> int:
+        return self._seq
+
+    def get(self, slug: str) -> CachedWishlist | None:
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is not None and self.ttl and entry.expires_at <= time.monotonic():
+                del self._entries[slug]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(slug)
+            return entry
+
+    def record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, slug: str, owner_id: str, is_public: bool, revision: int, variant: str, body: bytes, since: int):
+        if not self.max_size:
+            return
+        with self._lock:
+            if self._invalidated.get(slug, self._forgotten) > since:
+                return
+            entry = self._entries.get(slug)
+            if entry is None or entry.revision != revision or entry.owner_id != owner_id:
+                entry = self._entries[slug] = CachedWishlist(owner_id, is_public, revision, time.monotonic() + self.ttl)
+            entry.bodies[variant] = body
+            self._entries.move_to_end(slug)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, slug: str):
+        with self._lock:
+            self._seq += 1
+            self.invalidations += 1
+            self._entries.pop(slug, None)
+            self._invalidated[slug] = self._seq
+            self._invalidated.move_to_end(slug)
+            while len(self._invalidated) > self.max_size:
+                _, seq = self._invalidated.popitem(last=False)
+                self._forgotten = max(self._forgotten, seq)
+
+    def clear(self):
+        """Invalidate every slug at once, including renders still in flight."""
+        with self._lock:
+            self._seq += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._invalidated.clear()
+            self._forgotten = self._seq
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+wishlist_cache = WishlistCache(max_size=settings.WISHLIST_CACHE_SIZE, ttl=settings.WISHLIST_CACHE_TTL)
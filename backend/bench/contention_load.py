@@ -0,0 +1,173 @@
+"""Concurrent reserve / contribute load test.
+
+Creates a wishlist through the API, then fires a burst of concurrent reservations at
+one regular item and a burst of contributions at one group gift. Reports throughput
+and status codes, then checks the invariants the routes promise under contention:
+
+  * exactly one reservation succeeds and the item reads back as reserved
+  * the group gift total equals the sum of accepted contributions, and only the one that
+    reached the target may overshoot it
+  * contributors_count equals the number of accepted contributions
+  * no request fails with a 5xx
+
+Exits with status 1 when an invariant is violated.
+
+    cd backend
+    python -m bench.contention_load                                  # in-process app, temporary SQLite file
+    python -m bench.contention_load --base-url http://localhost:8000 --concurrency 200
+
+Against a running server use a database you don't mind filling with bench users.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from collections import Counter
+from decimal import Decimal
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+async def seed(client, target: Decimal) -> dict:
+    r = await client.post("/auth/register", json={
+        "email": f"owner-{uuid.uuid4().hex[:8]}@bench.example.com", "password": "bench-password", "name": "Owner",
+    })
+    r.raise_for_status()
+    headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+    r = await client.post("/wishlists/", json={"title": "Contention", "is_public": True}, headers=headers)
+    r.raise_for_status()
+    slug = r.json()["slug"]
+    r = await client.post(f"/wishlists/{slug}/items/", json={"name": "Reserve me", "price": "100"}, headers=headers)
+    r.raise_for_status()
+    item_id = r.json()["id"]
+    r = await client.post(f"/wishlists/{slug}/items/", json={
+        "name": "Chip in", "is_group_gift": True, "target_amount": str(target),
+    }, headers=headers)
+    r.raise_for_status()
+    return {"slug": slug, "item_id": item_id, "group_id": r.json()["id"]}
+
+
+async def burst(requests: list) -> tuple[list, float, list[float]]:
+    """Run the request factories at once; returns responses (or exceptions), wall time and latencies."""
+    latencies = []
+
+    async def timed(make):
+        started = time.perf_counter()
+        try:
+            return await make()
+        finally:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(timed(make) for make in requests), return_exceptions=True)
+    return responses, time.perf_counter() - started, latencies
+
+
+def report(name: str, responses: list, elapsed: float, latencies: list[float]) -> Counter:
+    statuses = Counter(r.status_code if not isinstance(r, Exception) else type(r).__name__ for r in responses)
+    latencies.sort()
+    print(f"{name}: {len(responses)} requests in {elapsed:.2f}s ({len(responses) / elapsed:.0f} req/s), "
+          f"p50 {statistics.median(latencies) * 1000:.1f} ms, "
+          f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000:.1f} ms, "
+          f"statuses {dict(sorted(statuses.items(), key=str))}")
+    return statuses
+
+
+async def run(client, concurrency: int, amount: Decimal, target: Decimal) -> list[str]:
+    ids = await seed(client, target)
+    slug = ids["slug"]
+    failures = []
+
+    responses, elapsed, latencies = await burst([
+        lambda n=n: client.post(f"/wishlists/{slug}/items/{ids['item_id']}/reserve/", json={"reserver_name": f"Guest {n}"})
+        for n in range(concurrency)
+    ])
+    statuses = report("reserve", responses, elapsed, latencies)
+    errors = [r for r in responses if isinstance(r, Exception) or r.status_code >= 500]
+    if statuses[201] != 1:
+        failures.append(f"{statuses[201]} reservations succeeded, expected exactly 1")
+
+    responses, elapsed, latencies = await burst([
+        lambda n=n: client.post(f"/wishlists/{slug}/items/{ids['group_id']}/contribute/",
+                                json={"contributor_name": f"Guest {n}", "amount": str(amount)})
+        for n in range(concurrency)
+    ])
+    statuses = report("contribute", responses, elapsed, latencies)
+    accepted = statuses[201]
+
+    errors += [r for r in responses if isinstance(r, Exception) or r.status_code >= 500]
+    if errors:
+        failures.append(f"{len(errors)} requests failed with a server error or exception")
+
+    r = await client.get(f"/wishlists/{slug}")
+    r.raise_for_status()
+    items = {i["id"]: i for i in r.json()["items"]}
+    reserved, group = items[ids["item_id"]], items[ids["group_id"]]
+    total = Decimal(str(group["total_contributed"]))
+    if not reserved["is_reserved"]:
+        failures.append("reserved item reads back as not reserved")
+    if total != amount * accepted:
+        failures.append(f"total {total} != {accepted} accepted x {amount}")
+    if total - amount >= target:
+        failures.append(f"total {total} kept growing after reaching the target {target}")
+    if group["contributors_count"] != accepted:
+        failures.append(f"contributors_count {group['contributors_count']} != {accepted} accepted")
+    print(f"group gift: {total} of {target} from {group['contributors_count']} contributors")
+    return failures
+
+
+async def main_async(args) -> list[str]:
+    import httpx
+
+    if args.base_url:
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+            return await run(client, args.concurrency, args.amount, args.target)
+
+    from alembic import command
+    from alembic.config import Config
+    from app.database import async_engine, engine
+    from app.main import app
+
+    alembic_cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    command.upgrade(alembic_cfg, "head")
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            return await run(client, args.concurrency, args.amount, args.target)
+    finally:
+        # aiosqlite connections each own a thread; leaving them pooled keeps the process alive
+        await async_engine.dispose()
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent reserve / contribute load test")
+    parser.add_argument("--base-url", default=None, help="running server; defaults to the app in-process")
+    parser.add_argument("--database-url", default=None, help="in-process only; defaults to a temporary SQLite file")
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--amount", type=Decimal, default=Decimal("10"), help="per contribution")
+    parser.add_argument("--target", type=Decimal, default=Decimal("250"), help="group gift target")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    if not args.base_url:
+        # Settings are read at import time, so the URL has to be in place before the app is imported
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp.name}/contention.db"
+        os.environ.setdefault("PRICE_REFRESH_ENABLED", "false")
+    failures = asyncio.run(main_async(args))
+    tmp.cleanup()
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        raise SystemExit(1)
+    print("all invariants hold")
+
+
+if __name__ == "__main__":
+    main()
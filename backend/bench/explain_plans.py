@@ -0,0 +1,184 @@
+"""Query plans of the hot read paths against seeded data.
+
+Migrates a throwaway database to head, seeds it with many users, lists, items and
+contributions, ANALYZEs it and prints the plan of every main route query. Each
+query names the index it is expected to use; the script exits with status 1 when
+a plan doesn't use it.
+
+    cd backend
+    python -m bench.explain_plans                                  # temporary SQLite file
+    python -m bench.explain_plans --database-url postgresql://...  # dedicated, empty database
+
+The statements mirror the ones the routes build; keep them in step when a route's query changes.
+"""
+import argparse
+import os
+import random
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def seed(conn, models, users: int, lists: int, items: int, contributions: int) -> dict:
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    rows = {name: [] for name in ("users", "wishlists", "items", "reservations", "contributions")}
+    for u in range(users):
+        user_id = str(uuid.uuid4())
+        rows["users"].append({"id": user_id, "email": f"user{u}@bench.local", "password_hash": "x", "name": f"User {u}"})
+        for w in range(lists):
+            wl_id = str(uuid.uuid4())
+            rows["wishlists"].append({
+                "id": wl_id, "user_id": user_id, "title": f"List {u}/{w}", "slug": f"list-{u}-{w}",
+                "is_public": True, "created_at": start + timedelta(hours=u * lists + w), "active_item_count": items,
+            })
+            for i in range(items):
+                item_id = str(uuid.uuid4())
+                group = i % 4 == 0
+                deleted = i % 10 == 9
+                rows["items"].append({
+                    "id": item_id, "wishlist_id": wl_id, "name": f"Item {i}", "price": Decimal("990"),
+                    "url": f"https://shop{i % 5}.example/p/{i}", "priority": rng.randint(1, 3),
+                    "is_group_gift": group, "is_deleted": deleted, "updated_revision": i,
+                    "deleted_at": start + timedelta(days=i) if deleted else None,
+                    "created_at": start + timedelta(minutes=i), "is_reserved": not group and i % 3 == 0,
+                    "contributors_count": contributions if group else 0,
+                    "contributed_total": Decimal(contributions * 100) if group else Decimal("0"),
+                })
+                if group:
+                    rows["contributions"].extend(
+                        {"id": str(uuid.uuid4()), "item_id": item_id, "contributor_name": f"Guest {n}",
+                         "amount": Decimal("100"), "created_at": start}
+                        for n in range(contributions)
+                    )
+                elif i % 3 == 0:
+                    rows["reservations"].append({
+                        "id": str(uuid.uuid4()), "item_id": item_id, "reserver_name": "Guest",
+                        "reserver_user_id": rng.choice(rows["users"])["id"], "is_cancelled": False,
+                    })
+    tables = {"users": models.User, "wishlists": models.Wishlist, "items": models.Item,
+              "reservations": models.Reservation, "contributions": models.Contribution}
+    for name, model in tables.items():
+        for start_at in range(0, len(rows[name]), 5000):
+            conn.execute(model.__table__.insert(), rows[name][start_at:start_at + 5000])
+    sample_list = rows["wishlists"][len(rows["wishlists"]) // 2]
+    return {
+        "user_id": sample_list["user_id"],
+        "wishlist_id": sample_list["id"],
+        "slug": sample_list["slug"],
+        "item_ids": [r["id"] for r in rows["items"] if r["wishlist_id"] == sample_list["id"]],
+        "reserver_id": rows["reservations"][0]["reserver_user_id"],
+        "counts": {name: len(r) for name, r in rows.items()},
+    }
+
+
+def route_queries(models, sample: dict) -> list[tuple[str, object, str]]:
+    """(name, statement, index the plan should use)."""
+    from sqlalchemy import and_, or_, select
+    Item, Wishlist = models.Item, models.Wishlist
+    last = datetime(2025, 6, 1)
+    return [
+        ("get_wishlist: list by slug",
+         select(Wishlist, models.User).join(models.User, Wishlist.user_id == models.User.id)
+         .where(Wishlist.slug == sample["slug"]).limit(1),
+         "ix_wishlists_slug"),
+        ("get_wishlist: live items in display order",
+         select(Item).where(Item.wishlist_id == sample["wishlist_id"], Item.is_deleted == False)
+         .order_by(Item.priority.desc(), Item.created_at, Item.id),
+         "ix_items_wishlist_active_order"),
+        ("get_wishlist: next page of items",
+         select(Item).where(
+             Item.wishlist_id == sample["wishlist_id"], Item.is_deleted == False,
+             or_(Item.priority < 2, and_(Item.priority == 2, Item.created_at > last)),
+         ).order_by(Item.priority.desc(), Item.created_at, Item.id).limit(50),
+         "ix_items_wishlist_active_order"),
+        ("get_wishlist (guest): contributions of the page",
+         select(models.Contribution).where(models.Contribution.item_id.in_(sample["item_ids"])),
+         "ix_contributions_item_id"),
+        ("get_wishlist_changes: items since revision",
+         select(Item).where(Item.wishlist_id == sample["wishlist_id"], Item.updated_revision > 30),
+         "ix_items_wishlist_id"),
+        ("list_wishlists: first page",
+         select(Wishlist).where(Wishlist.user_id == sample["user_id"])
+         .order_by(Wishlist.created_at.desc(), Wishlist.id.desc()).limit(50),
+         "ix_wishlists_user_created"),
+        ("compact-items: long soft-deleted items",
+         select(Item.id, Item.wishlist_id).where(Item.is_deleted == True, Item.deleted_at < last)
+         .order_by(Item.deleted_at).limit(500),
+         "ix_items_deleted_at"),
+        ("reservations by user",
+         select(models.Reservation).where(models.Reservation.reserver_user_id == sample["reserver_id"]),
+         "ix_reservations_reserver_user_id"),
+    ]
+
+
+def explain(conn, stmt) -> list[str]:
+    """Plan of `stmt` exactly as the driver would receive it, bound parameters included."""
+    from sqlalchemy import event
+
+    plan: list[str] = []
+    sqlite = conn.dialect.name == "sqlite"
+
+    def before(conn_, cursor, statement, parameters, context, executemany):
+        probe = conn_.connection.dbapi_connection.cursor()
+        probe.execute(("EXPLAIN QUERY PLAN " if sqlite else "EXPLAIN ") + statement, parameters)
+        plan.extend(row[3] if sqlite else row[0] for row in probe.fetchall())
+        probe.close()
+
+    event.listen(conn, "before_cursor_execute", before)
+    try:
+        conn.execute(stmt).fetchall()
+    finally:
+        event.remove(conn, "before_cursor_execute", before)
+    return plan
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check hot-path query plans against seeded data")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--lists", type=int, default=5, help="wishlists per user")
+    parser.add_argument("--items", type=int, default=40, help="items per wishlist")
+    parser.add_argument("--contributions", type=int, default=8, help="contributions per group gift")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    # Settings are read at import time, so the URL has to be in place before the app is imported
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp.name}/explain.db"
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import text
+    from app import models
+    from app.database import engine
+
+    alembic_cfg = Config(str(BACKEND_DIR / "alembic.ini"))
+    alembic_cfg.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    command.upgrade(alembic_cfg, "head")
+
+    with engine.begin() as conn:
+        sample = seed(conn, models, args.users, args.lists, args.items, args.contributions)
+        conn.execute(text("ANALYZE"))
+    print("seeded " + ", ".join(f"{n} {name}" for name, n in sample["counts"].items()))
+
+    misses = 0
+    with engine.connect() as conn:
+        for name, stmt, index in route_queries(models, sample):
+            plan = explain(conn, stmt)
+            ok = any(index in line for line in plan)
+            misses += not ok
+            print(f"\n[{'ok' if ok else 'MISS'}] {name} (expects {index})")
+            for line in plan:
+                print(f"    {line}")
+    engine.dispose()
+    tmp.cleanup()
+
+    if misses:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
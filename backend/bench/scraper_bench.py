@@ -0,0 +1,205 @@
+"""Offline scraper benchmark.
+
+Serves the saved pages in bench/corpus from a local HTTP server and runs the
+scraper over them, reporting throughput, latency, memory and extraction accuracy
+against corpus/manifest.json. No outside network is touched.
+
+    cd backend
+    python -m bench.scraper_bench                      # fetch + parse through the local server
+    python -m bench.scraper_bench --mode extract       # parse only, no sockets at all
+    python -m bench.scraper_bench --inflate-kb 1500    # pad pages to marketplace size
+
+Exits with status 1 when accuracy drops below --min-accuracy, so it can gate changes.
+"""
+import argparse
+import asyncio
+import functools
+import json
+import resource
+import statistics
+import threading
+import time
+import tracemalloc
+from decimal import Decimal
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from app.routers.scraper import CHUNK_SIZE, fetch_and_extract
+from app.scraping.client import scraper_client
+from app.scraping.extract import StreamingExtractor
+from app.scraping.rules import rule_for
+from app.scraping.workers import parse_pool
+
+CORPUS_DIR = Path(__file__).parent / "corpus"
+FIELDS = ("name", "price", "image_url")
+
+
+def load_manifest() -> list[dict]:
+    return json.loads((CORPUS_DIR / "manifest.json").read_text(encoding="utf-8"))
+
+
+def filler(kb: int) -> bytes:
+    block = b'<div class="reviews__item"><p>' + b"lorem ipsum dolor sit amet " * 30 + b"</p></div>\n"
+    return block * max(1, kb * 1024 // len(block)) if kb else b""
+
+
+def load_pages(manifest: list[dict], inflate_kb: int) -> dict[str, bytes]:
+    pad = filler(inflate_kb)
+    pages = {}
+    for entry in manifest:
+        body = (CORPUS_DIR / entry["file"]).read_bytes()
+        if pad:
+            # Padding goes after the product block, like reviews and recommendations do
+            body = body.replace(b"</body>", pad + b"</body>", 1)
+        pages[entry["file"]] = body
+    return pages
+
+
+class CorpusHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; Nagle + delayed ACK would add ~40 ms each
+    disable_nagle_algorithm = True
+
+    def __init__(self, *args, pages: dict[str, bytes], **kwargs):
+        self.pages = pages
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):
+        body = self.pages.get(self.path.lstrip("/"))
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        # No charset on purpose: pages must declare their own, as real shops often do
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(pages: dict[str, bytes]) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(CorpusHandler, pages=pages))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def extract_offline(body: bytes, origin_url: str):
+    extractor = StreamingExtractor(rule=rule_for(origin_url))
+    for start in range(0, len(body), CHUNK_SIZE):
+        if extractor.feed(body[start:start + CHUNK_SIZE]):
+            break
+    return extractor.result()
+
+
+def score(entry: dict, result) -> dict[str, bool]:
+    expected = entry["expected"]
+    return {
+        "name": result.name == expected["name"],
+        "price": result.price == (Decimal(expected["price"]) if expected["price"] is not None else None),
+        "image_url": result.image_url == expected["image_url"],
+    }
+
+
+async def run(args) -> dict:
+    manifest = load_manifest()
+    pages = load_pages(manifest, args.inflate_kb)
+    server = start_server(pages) if args.mode == "fetch" else None
+    base = f"http://127.0.0.1:{server.server_address[1]}/" if server else ""
+
+    latencies: list[float] = []
+    results: dict[str, object] = {}
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def one(entry: dict):
+        async with slots:
+            started = time.perf_counter()
+            if args.mode == "fetch":
+                result = await fetch_and_extract(base + entry["file"], rule=rule_for(entry["origin_url"]))
+            else:
+                result = extract_offline(pages[entry["file"]], entry["origin_url"])
+            latencies.append(time.perf_counter() - started)
+            results[entry["file"]] = result
+
+    async def round_(iterations: int) -> float:
+        latencies.clear()
+        started = time.perf_counter()
+        await asyncio.gather(*(one(entry) for _ in range(iterations) for entry in manifest))
+        return time.perf_counter() - started
+
+    try:
+        # Warm-up builds the HTTP client, opens connections and starts the parse lanes
+        await round_(1)
+        # tracemalloc slows allocation-heavy code a lot, so memory gets its own round
+        tracemalloc.start()
+        await round_(1)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        elapsed = await round_(args.iterations)
+    finally:
+        await scraper_client.close()
+        parse_pool.close()
+        if server:
+            server.shutdown()
+
+    failures = []
+    field_hits = dict.fromkeys(FIELDS, 0)
+    for entry in manifest:
+        checks = score(entry, results[entry["file"]])
+        for field, ok in checks.items():
+            field_hits[field] += ok
+            if not ok:
+                failures.append({
+                    "file": entry["file"],
+                    "field": field,
+                    "expected": entry["expected"][field],
+                    "got": str(getattr(results[entry["file"]], field)),
+                })
+
+    latencies.sort()
+    checks_total = len(manifest) * len(FIELDS)
+    return {
+        "mode": args.mode,
+        "pages": len(latencies),
+        "page_kb_avg": round(sum(map(len, pages.values())) / len(pages) / 1024, 1),
+        "pages_per_sec": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000, 2),
+        "peak_traced_kb": round(peak / 1024, 1),
+        "max_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "accuracy": round(sum(field_hits.values()) / checks_total, 4),
+        "accuracy_by_field": {f: round(n / len(manifest), 4) for f, n in field_hits.items()},
+        "failures": failures,
+        "parse_pool": parse_pool.snapshot() if args.mode == "fetch" else None,
+        "http_pool": scraper_client.stats.snapshot() if args.mode == "fetch" else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline scraper benchmark")
+    parser.add_argument("--mode", choices=("fetch", "extract"), default="fetch")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--inflate-kb", type=int, default=0, help="pad every page body by roughly this many KB")
+    parser.add_argument("--min-accuracy", type=float, default=1.0)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        for key in ("mode", "pages", "page_kb_avg", "pages_per_sec", "p50_ms", "p99_ms",
+                    "peak_traced_kb", "max_rss_mb", "accuracy"):
+            print(f"{key:>16}: {report[key]}")
+        for failure in report["failures"]:
+            print(f"  MISS {failure['file']} {failure['field']}: expected {failure['expected']!r}, got {failure['got']!r}")
+
+    if report["accuracy"] < args.min_accuracy:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
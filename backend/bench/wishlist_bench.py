@@ -0,0 +1,183 @@
+"""Public wishlist read benchmark.
+
+Seeds a throwaway database with one wishlist of group gifts and compares the old
+single joinedload query (items x contributions rows, de-duplicated and sorted in
+Python) against the current (uncached) get_wishlist path, for both the owner and a guest.
+Reports statements issued, rows fetched and latency.
+
+    cd backend
+    python -m bench.wishlist_bench
+    python -m bench.wishlist_bench --items 60 --contributions 40 --database-url postgresql://...
+
+Use a dedicated database: the tables are dropped and recreated.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+
+def seed(db, models, items: int, contributions: int, deleted: int) -> tuple[str, str]:
+    owner = models.User(email="owner@bench.local", password_hash="x", name="Owner")
+    db.add(owner)
+    db.flush()
+    wl = models.Wishlist(user_id=owner.id, title="Bench", slug="bench", active_item_count=items)
+    db.add(wl)
+    db.flush()
+    for i in range(items + deleted):
+        group = i % 2 == 0
+        item = models.Item(
+            wishlist_id=wl.id, name=f"Item {i}", price=Decimal("1000"), priority=1 + i % 3,
+            is_group_gift=group, target_amount=Decimal("100000") if group else None,
+            is_deleted=i >= items,
+            contributed_total=Decimal(contributions * 10) if group else 0,
+            contributors_count=contributions if group else 0,
+            is_reserved=not group,
+        )
+        db.add(item)
+        db.flush()
+        if group:
+            db.add_all(
+                models.Contribution(item_id=item.id, contributor_name=f"Guest {n}", amount=Decimal("10"))
+                for n in range(contributions)
+            )
+        else:
+            db.add(models.Reservation(item_id=item.id, reserver_name="Guest"))
+    db.commit()
+    return owner.id, wl.slug
+
+
+def legacy_get_wishlist(db, models, schemas, slug: str, user):
+    """The read path before items were filtered, sorted and aggregated in SQL; kept as the baseline."""
+    from sqlalchemy.orm import joinedload
+    from app.thumbnails import thumbnail_urls
+
+    wl = (
+        db.query(models.Wishlist)
+        .filter(models.Wishlist.slug == slug)
+        .options(
+            joinedload(models.Wishlist.items).joinedload(models.Item.reservation),
+            joinedload(models.Wishlist.items).joinedload(models.Item.contributions),
+            joinedload(models.Wishlist.owner),
+        )
+        .first()
+    )
+    is_owner = bool(user and user.id == wl.user_id)
+    items = []
+    for item in sorted(wl.items, key=lambda i: (-i.priority, i.created_at)):
+        if item.is_deleted:
+            continue
+        items.append(schemas.ItemOut(
+            id=item.id, wishlist_id=item.wishlist_id, name=item.name, url=item.url, price=item.price,
+            image_url=item.image_url, thumbnails=thumbnail_urls(item.image_digest),
+            description=item.description, priority=item.priority, is_group_gift=item.is_group_gift,
+            target_amount=item.target_amount, is_deleted=item.is_deleted, created_at=item.created_at,
+            is_reserved=bool(item.reservation and not item.reservation.is_cancelled),
+            total_contributed=sum((c.amount for c in item.contributions), Decimal("0")),
+            contributors_count=len(item.contributions),
+            contributors=[] if is_owner else [
+                schemas.ContributionInfo(contributor_name=c.contributor_name, created_at=c.created_at)
+                for c in item.contributions
+            ],
+        ))
+    return items
+
+
+@contextmanager
+def count_statements(engine, counter: dict):
+    """Count statements and the rows each SELECT returns (re-running it as a COUNT, outside the timings)."""
+    from sqlalchemy import event
+
+    def after(conn, cursor, statement, parameters, context, executemany):
+        counter["statements"] += 1
+        if statement.lstrip().upper().startswith("SELECT"):
+            probe = conn.connection.dbapi_connection.cursor()
+            probe.execute(f"SELECT count(*) FROM ({statement}) AS rows_", parameters)
+            counter["rows"] += probe.fetchone()[0]
+            probe.close()
+
+    event.listen(engine, "after_cursor_execute", after)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "after_cursor_execute", after)
+
+
+def measure(engine, SessionLocal, fn, iterations: int) -> dict:
+    counter = {"statements": 0, "rows": 0}
+    db = SessionLocal()
+    try:
+        with count_statements(engine, counter):
+            n_items = len(fn(db))
+    finally:
+        db.close()
+
+    latencies = []
+    for _ in range(iterations):
+        db = SessionLocal()
+        try:
+            started = time.perf_counter()
+            fn(db)
+            latencies.append(time.perf_counter() - started)
+        finally:
+            db.close()
+    latencies.sort()
+    return {
+        "items": n_items,
+        **counter,
+        "p50_ms": round(statistics.median(latencies) * 1000, 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Public wishlist read benchmark")
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    parser.add_argument("--items", type=int, default=60)
+    parser.add_argument("--deleted", type=int, default=10, help="extra soft-deleted items")
+    parser.add_argument("--contributions", type=int, default=40, help="contributions per group gift")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="print the raw report as JSON")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    # Settings are read at import time, so the URL has to be in place before the app is imported
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tmp.name}/wishlist_bench.db"
+    from app import models, schemas
+    from app.database import Base, SessionLocal, engine
+    from app.routers.wishlists import load_wishlist
+
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    owner_id, slug = seed(db, models, args.items, args.contributions, args.deleted)
+    owner = db.get(models.User, owner_id)
+    db.expunge(owner)
+    db.close()
+
+    report = {}
+    for viewer, user in (("owner", owner), ("guest", None)):
+        report[viewer] = {
+            "legacy": measure(engine, SessionLocal, lambda s: legacy_get_wishlist(s, models, schemas, slug, user),
+                              args.iterations),
+            "current": measure(engine, SessionLocal, lambda s: load_wishlist(slug, s, user).items, args.iterations),
+        }
+    engine.dispose()
+    tmp.cleanup()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{args.items} items (+{args.deleted} deleted), {args.contributions} contributions per group gift")
+    for viewer, runs in report.items():
+        for name, r in runs.items():
+            print(f"  {viewer:>5} {name:>7}: {r['statements']:>3} statements {r['rows']:>6} rows "
+                  f"p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Baseline schema, as create_all used to build it
+
+Databases that create_all built before migrations existed get stamped with it by `python -m app.migrate`.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=False)
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("name", sa.String(100), nullable=False),
+        sa.Column("avatar_url", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "wishlists",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("user_id", UUID, sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("title", sa.String(200), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("cover_emoji", sa.String(10), nullable=True),
+        sa.Column("slug", sa.String(100), nullable=False),
+        sa.Column("is_public", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_wishlists_slug", "wishlists", ["slug"], unique=True)
+
+    op.create_table(
+        "items",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("wishlist_id", UUID, sa.ForeignKey("wishlists.id"), nullable=False),
+        sa.Column("name", sa.String(300), nullable=False),
+        sa.Column("url", sa.Text(), nullable=True),
+        sa.Column("price", sa.Numeric(12, 2), nullable=True),
+        sa.Column("image_url", sa.Text(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=True),
+        sa.Column("is_group_gift", sa.Boolean(), nullable=True),
+        sa.Column("target_amount", sa.Numeric(12, 2), nullable=True),
+        sa.Column("is_deleted", sa.Boolean(), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "reservations",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("item_id", UUID, sa.ForeignKey("items.id"), nullable=False, unique=True),
+        sa.Column("reserver_name", sa.String(100), nullable=False),
+        sa.Column("reserver_email", sa.String(255), nullable=True),
+        sa.Column("reserver_user_id", UUID, sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("is_cancelled", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+    op.create_table(
+        "contributions",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("item_id", UUID, sa.ForeignKey("items.id"), nullable=False),
+        sa.Column("contributor_name", sa.String(100), nullable=False),
+        sa.Column("contributor_email", sa.String(255), nullable=True),
+        sa.Column("contributor_user_id", UUID, sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+
+
+def downgrade():
+    op.drop_table("contributions")
+    op.drop_table("reservations")
+    op.drop_table("items")
+    op.drop_index("ix_wishlists_slug", table_name="wishlists")
+    op.drop_table("wishlists")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_table("users")
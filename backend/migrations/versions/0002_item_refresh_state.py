@@ -0,0 +1,33 @@
+"""Price refresh state per item
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=False)
+
+
+def upgrade():
+    op.create_table(
+        "item_refresh_state",
+        sa.Column("item_id", UUID, sa.ForeignKey("items.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("etag", sa.String(255), nullable=True),
+        sa.Column("last_modified", sa.String(64), nullable=True),
+        sa.Column("checked_at", sa.DateTime(), nullable=True),
+        sa.Column("failures", sa.Integer(), nullable=True),
+    )
+    op.create_index("ix_item_refresh_state_checked_at", "item_refresh_state", ["checked_at"])
+
+
+def downgrade():
+    op.drop_index("ix_item_refresh_state_checked_at", table_name="item_refresh_state")
+    op.drop_table("item_refresh_state")
@@ -0,0 +1,23 @@
+"""Thumbnail digest of each item's image
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("items") as batch:
+        batch.add_column(sa.Column("image_digest", sa.String(64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("items") as batch:
+        batch.drop_column("image_digest")
@@ -0,0 +1,46 @@
+"""Denormalized reservation, contribution and item counters
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("items") as batch:
+        batch.add_column(sa.Column("is_reserved", sa.Boolean(), nullable=False, server_default=sa.false()))
+        batch.add_column(sa.Column("contributed_total", sa.Numeric(12, 2), nullable=False, server_default="0"))
+        batch.add_column(sa.Column("contributors_count", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("wishlists") as batch:
+        batch.add_column(sa.Column("active_item_count", sa.Integer(), nullable=False, server_default="0"))
+
+    # Backfill the counters; the same statements as `python -m app.commands repair-counters`
+    op.execute("""
+        UPDATE items SET
+            contributed_total = (SELECT coalesce(sum(amount), 0) FROM contributions WHERE item_id = items.id),
+            contributors_count = (SELECT count(*) FROM contributions WHERE item_id = items.id),
+            is_reserved = EXISTS (
+                SELECT 1 FROM reservations WHERE item_id = items.id AND is_cancelled = false
+            )
+    """)
+    op.execute("""
+        UPDATE wishlists SET active_item_count = (
+            SELECT count(*) FROM items WHERE wishlist_id = wishlists.id AND is_deleted = false
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table("wishlists") as batch:
+        batch.drop_column("active_item_count")
+    with op.batch_alter_table("items") as batch:
+        batch.drop_column("contributors_count")
+        batch.drop_column("contributed_total")
+        batch.drop_column("is_reserved")
@@ -0,0 +1,27 @@
+"""Wishlist revisions for ETags and the changes feed
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("wishlists") as batch:
+        batch.add_column(sa.Column("revision", sa.Integer(), nullable=False, server_default="0"))
+    with op.batch_alter_table("items") as batch:
+        batch.add_column(sa.Column("updated_revision", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade():
+    with op.batch_alter_table("items") as batch:
+        batch.drop_column("updated_revision")
+    with op.batch_alter_table("wishlists") as batch:
+        batch.drop_column("revision")
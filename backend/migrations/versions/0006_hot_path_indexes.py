@@ -0,0 +1,50 @@
+"""Foreign key and hot-path indexes
+
+On PostgreSQL the indexes are built CONCURRENTLY so live traffic isn't blocked.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+# Spelled the way each dialect renders `Item.is_deleted == False`, or the planner won't match it
+NOT_DELETED = {"postgresql_where": sa.text("is_deleted = false"), "sqlite_where": sa.text("is_deleted = 0")}
+
+
+def create_indexes(concurrently: bool):
+    opts = {"postgresql_concurrently": concurrently}
+    op.create_index("ix_items_wishlist_id", "items", ["wishlist_id"], **opts)
+    op.create_index("ix_contributions_item_id", "contributions", ["item_id"], **opts)
+    op.create_index("ix_reservations_reserver_user_id", "reservations", ["reserver_user_id"], **opts)
+    op.create_index(
+        "ix_wishlists_user_created", "wishlists",
+        ["user_id", sa.text("created_at DESC"), sa.text("id DESC")], **opts,
+    )
+    op.create_index(
+        "ix_items_wishlist_active_order", "items",
+        ["wishlist_id", sa.text("priority DESC"), "created_at", "id"],
+        **NOT_DELETED, **opts,
+    )
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            create_indexes(concurrently=True)
+    else:
+        create_indexes(concurrently=False)
+
+
+def downgrade():
+    op.drop_index("ix_items_wishlist_active_order", table_name="items")
+    op.drop_index("ix_wishlists_user_created", table_name="wishlists")
+    op.drop_index("ix_reservations_reserver_user_id", table_name="reservations")
+    op.drop_index("ix_contributions_item_id", table_name="contributions")
+    op.drop_index("ix_items_wishlist_id", table_name="items")
@@ -0,0 +1,85 @@
+"""Archive tables for compacted soft-deleted items
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+UUID = postgresql.UUID(as_uuid=False)
+
+DELETED = {"postgresql_where": sa.text("is_deleted = true"), "sqlite_where": sa.text("is_deleted = 1")}
+
+
+def upgrade():
+    with op.batch_alter_table("wishlists") as batch:
+        batch.add_column(sa.Column("compacted_revision", sa.Integer(), nullable=False, server_default="0"))
+
+    op.create_table(
+        "archived_items",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("wishlist_id", UUID, sa.ForeignKey("wishlists.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("name", sa.String(300), nullable=False),
+        sa.Column("url", sa.Text(), nullable=True),
+        sa.Column("price", sa.Numeric(12, 2), nullable=True),
+        sa.Column("image_url", sa.Text(), nullable=True),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("priority", sa.Integer(), nullable=True),
+        sa.Column("is_group_gift", sa.Boolean(), nullable=True),
+        sa.Column("target_amount", sa.Numeric(12, 2), nullable=True),
+        sa.Column("deleted_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("contributed_total", sa.Numeric(12, 2), nullable=False),
+        sa.Column("contributors_count", sa.Integer(), nullable=False),
+        sa.Column("updated_revision", sa.Integer(), nullable=False),
+        sa.Column("archived_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_archived_items_wishlist_id", "archived_items", ["wishlist_id"])
+    op.create_table(
+        "archived_reservations",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("item_id", UUID, sa.ForeignKey("archived_items.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("reserver_name", sa.String(100), nullable=False),
+        sa.Column("reserver_email", sa.String(255), nullable=True),
+        sa.Column("reserver_user_id", UUID, nullable=True),
+        sa.Column("is_cancelled", sa.Boolean(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_archived_reservations_item_id", "archived_reservations", ["item_id"])
+    op.create_table(
+        "archived_contributions",
+        sa.Column("id", UUID, primary_key=True),
+        sa.Column("item_id", UUID, sa.ForeignKey("archived_items.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("contributor_name", sa.String(100), nullable=False),
+        sa.Column("contributor_email", sa.String(255), nullable=True),
+        sa.Column("contributor_user_id", UUID, nullable=True),
+        sa.Column("amount", sa.Numeric(12, 2), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_archived_contributions_item_id", "archived_contributions", ["item_id"])
+
+    # Built CONCURRENTLY on PostgreSQL, like 0006, since items is the busy table
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index("ix_items_deleted_at", "items", ["deleted_at"], postgresql_concurrently=True, **DELETED)
+    else:
+        op.create_index("ix_items_deleted_at", "items", ["deleted_at"], **DELETED)
+
+
+def downgrade():
+    op.drop_index("ix_items_deleted_at", table_name="items")
+    op.drop_index("ix_archived_contributions_item_id", table_name="archived_contributions")
+    op.drop_table("archived_contributions")
+    op.drop_index("ix_archived_reservations_item_id", table_name="archived_reservations")
+    op.drop_table("archived_reservations")
+    op.drop_index("ix_archived_items_wishlist_id", table_name="archived_items")
+    op.drop_table("archived_items")
+    with op.batch_alter_table("wishlists") as batch:
+        batch.drop_column("compacted_revision")
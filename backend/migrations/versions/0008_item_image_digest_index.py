@@ -0,0 +1,31 @@
+"""Index items by thumbnail digest
+
+GET /images falls back to the item's source image when a thumbnail is missing
+from this replica's disk, and finds the item by its digest.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+HAS_DIGEST = {"postgresql_where": sa.text("image_digest IS NOT NULL"), "sqlite_where": sa.text("image_digest IS NOT NULL")}
+
+
+def upgrade():
+    # Built CONCURRENTLY on PostgreSQL, like 0006, since items is the busy table
+    if op.get_bind().dialect.name == "postgresql":
+        with op.get_context().autocommit_block():
+            op.create_index("ix_items_image_digest", "items", ["image_digest"], postgresql_concurrently=True, **HAS_DIGEST)
+    else:
+        op.create_index("ix_items_image_digest", "items", ["image_digest"], **HAS_DIGEST)
+
+
+def downgrade():
+    op.drop_index("ix_items_image_digest", table_name="items")
@@ -51,11 +51,13 @@ export default function WishlistPage() {
 
       switch (event.type) {
         case "item_added":
+        case "items_added":
           // Refetch to get full item data
           fetchWishlist();
           return prev;
 
         case "item_updated":
+        case "resync":
           fetchWishlist();
           return prev;
 
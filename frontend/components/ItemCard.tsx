@@ -4,7 +4,7 @@ import { ExternalLink, Edit2, Trash2, Users, CheckCircle, ChevronUp } from "luci
 import { Button } from "@/components/ui/button";
 import { Badge } from "@/components/ui/badge";
 import { Progress } from "@/components/ui/progress";
-import { Item } from "@/lib/api";
+import { Item, itemImageSrc } from "@/lib/api";
 
 interface Props {
   item: Item;
@@ -35,7 +35,7 @@ export function ItemCard({ item, isOwner, onReserve, onCancelReserve, onContribu
       {item.image_url && (
         <div className="relative h-44 bg-gray-50 overflow-hidden">
           <Image
-            src={item.image_url}
+            src={itemImageSrc(item, 640)!}
             alt={item.name}
             fill
             className="object-cover"
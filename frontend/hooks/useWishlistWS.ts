@@ -8,8 +8,11 @@ export type WSEvent =
   | { type: "item_unreserved"; item_id: string }
   | { type: "contribution_added"; item_id: string; total_contributed: number; contributors_count: number; contributor_name: string }
   | { type: "item_added"; item: unknown }
+  | { type: "items_added"; items: unknown[] }
   | { type: "item_updated"; item: unknown }
-  | { type: "item_deleted"; item_id: string };
+  | { type: "item_deleted"; item_id: string }
+  // Server may have missed events for this list; reload it
+  | { type: "resync" };
 
 export function useWishlistWS(slug: string, onEvent: (event: WSEvent) => void) {
   const wsRef = useRef<WebSocket | null>(null);
@@ -73,6 +73,12 @@ export interface ContributionInfo {
   created_at: string;
 }
 
+export interface Thumbnail {
+  width: number;
+  webp: string;
+  jpg: string;
+}
+
 export interface Item {
   id: string;
   wishlist_id: string;
@@ -80,6 +86,7 @@ export interface Item {
   url?: string;
   price?: number;
   image_url?: string;
+  thumbnails?: Thumbnail[];
   description?: string;
   priority: number;
   is_group_gift: boolean;
@@ -92,9 +99,23 @@ export interface Item {
   contributors: ContributionInfo[];
 }
 
+// Smallest server thumbnail at least `width` px wide, falling back to the original image
+export function itemImageSrc(item: Item, width: number): string | undefined {
+  const thumbs = item.thumbnails ?? [];
+  const thumb = thumbs.find((t) => t.width >= width) ?? thumbs[thumbs.length - 1];
+  return thumb ? `${API_BASE}${thumb.webp}` : item.image_url;
+}
+
+export interface WishlistPage {
+  wishlists: Wishlist[];
+  next_cursor?: string | null;
+}
+
 export interface WishlistWithItems extends Wishlist {
   items: Item[];
   owner_name: string;
+  revision: number;
+  next_cursor?: string | null;
 }
 
 // Auth API
@@ -118,7 +139,7 @@ export const authApi = {
 
 // Wishlists API
 export const wishlistApi = {
-  list: () => request<Wishlist[]>("/wishlists/"),
+  list: () => request<WishlistPage>("/wishlists/").then((page) => page.wishlists),
 
   create: (data: {
     title: string;
@@ -162,6 +183,25 @@ export const itemApi = {
       body: JSON.stringify(data),
     }),
 
+  createMany: (
+    slug: string,
+    items: {
+      name: string;
+      url?: string;
+      price?: number;
+      image_url?: string;
+      description?: string;
+      priority?: number;
+      is_group_gift?: boolean;
+      target_amount?: number;
+    }[],
+    autofill = false
+  ) =>
+    request<Item[]>(`/wishlists/${slug}/items/bulk`, {
+      method: "POST",
+      body: JSON.stringify({ items, autofill }),
+    }),
+
   update: (
     slug: string,
     itemId: string,
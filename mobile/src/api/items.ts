@@ -13,6 +13,17 @@ export const itemsApi = {
         target_amount?: number;
     }) => client.post<ItemOut>(`/wishlists/${slug}/items/`, data),
 
+    addMany: (slug: string, items: {
+        name: string;
+        url?: string;
+        price?: number;
+        image_url?: string;
+        description?: string;
+        priority?: number;
+        is_group_gift?: boolean;
+        target_amount?: number;
+    }[], autofill = false) => client.post<ItemOut[]>(`/wishlists/${slug}/items/bulk`, { items, autofill }),
+
     update: (slug: string, itemId: string, data: Partial<{
         name: string;
         url: string;
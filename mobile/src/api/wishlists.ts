@@ -18,6 +18,12 @@ export interface ContributionInfo {
     created_at: string;
 }
 
+export interface Thumbnail {
+    width: number;
+    webp: string;
+    jpg: string;
+}
+
 export interface ItemOut {
     id: string;
     wishlist_id: string;
@@ -25,6 +31,7 @@ export interface ItemOut {
     url?: string;
     price?: number;
     image_url?: string;
+    thumbnails?: Thumbnail[];
     description?: string;
     priority: number;
     is_group_gift: boolean;
@@ -37,19 +44,36 @@ export interface ItemOut {
     contributors: ContributionInfo[];
 }
 
+export interface WishlistPage {
+    wishlists: WishlistOut[];
+    next_cursor?: string | null;
+}
+
 export interface WishlistWithItems extends WishlistOut {
     items: ItemOut[];
     owner_name: string;
+    revision: number;
+    next_cursor?: string | null;
+}
+
+export interface WishlistChanges {
+    revision: number;
+    wishlist: WishlistOut;
+    items: ItemOut[];
+    removed_item_ids: string[];
 }
 
 export const wishlistApi = {
-    list: () => client.get<WishlistOut[]>('/wishlists/'),
+    list: () => client.get<WishlistPage>('/wishlists/'),
 
     create: (data: { title: string; description?: string; cover_emoji?: string; is_public?: boolean }) =>
         client.post<WishlistOut>('/wishlists/', data),
 
     get: (slug: string) => client.get<WishlistWithItems>(`/wishlists/${slug}`),
 
+    changes: (slug: string, since: number) =>
+        client.get<WishlistChanges>(`/wishlists/${slug}/changes`, { params: { since } }),
+
     update: (slug: string, data: Partial<{ title: string; description: string; cover_emoji: string; is_public: boolean }>) =>
         client.patch<WishlistOut>(`/wishlists/${slug}`, data),
 
@@ -5,7 +5,7 @@ import {
 import { ItemOut } from '../api/wishlists';
 import ProgressBar from './ProgressBar';
 import { colors, spacing, radius, typography } from '../theme';
-import { PRIORITY_COLORS, PRIORITY_LABELS } from '../constants';
+import { API_URL, PRIORITY_COLORS, PRIORITY_LABELS } from '../constants';
 
 interface Props {
     item: ItemOut;
@@ -24,13 +24,17 @@ export default function ItemCard({ item, isOwner, onReserve, onContribute, onDel
         ? Number(item.total_contributed) / Number(item.target_amount)
         : 0;
 
+    // Server-side thumbnail when ready; the shop's original otherwise
+    const thumb = item.thumbnails?.find(t => t.width >= 320);
+    const imageUri = thumb ? `${API_URL}${thumb.jpg}` : item.image_url;
+
     const priceLabel = item.price ? `₽${Number(item.price).toLocaleString()}` : null;
     const priorityColor = PRIORITY_COLORS[item.priority] || colors.textMuted;
 
     return (
         <Animated.View style={[styles.card, { transform: [{ scale }] }, item.is_reserved && styles.cardReserved]}>
-            {item.image_url ? (
-                <Image source={{ uri: item.image_url }} style={styles.image} resizeMode="cover" />
+            {imageUri ? (
+                <Image source={{ uri: imageUri }} style={styles.image} resizeMode="cover" />
             ) : (
                 <View style={[styles.image, styles.imagePlaceholder]}>
                     <Text style={{ fontSize: 28 }}>🎁</Text>
@@ -3,11 +3,14 @@ import { WS_URL } from '../constants';
 
 export type WsEvent =
     | { type: 'item_added'; item: any }
+    | { type: 'items_added'; items: any[] }
     | { type: 'item_updated'; item: any }
     | { type: 'item_deleted'; item_id: string }
     | { type: 'item_reserved'; item_id: string; reserver_name: string }
     | { type: 'item_unreserved'; item_id: string }
-    | { type: 'contribution_added'; item_id: string; total_contributed: number; contributors_count: number; contributor_name: string };
+    | { type: 'contribution_added'; item_id: string; total_contributed: number; contributors_count: number; contributor_name: string }
+    // Server may have missed events for this list; reload it
+    | { type: 'resync' };
 
 interface UseWebSocketOptions {
     slug: string | null;
@@ -20,7 +20,7 @@ export default function HomeScreen({ navigation }: any) {
     const load = useCallback(async () => {
         try {
             const res = await wishlistApi.list();
-            setWishlists(res.data);
+            setWishlists(res.data.wishlists);
         } catch {
             // ignore
         } finally {
@@ -42,10 +42,15 @@ export default function PublicWishlistScreen({ route, navigation }: any) {
     useWebSocket({
         slug,
         onEvent: useCallback((event: WsEvent) => {
+            if (event.type === 'resync') {
+                if (slug) wishlistApi.get(slug).then(res => setWishlist(res.data)).catch(() => {});
+                return;
+            }
             setWishlist(prev => {
                 if (!prev) return prev;
                 const items = [...prev.items];
                 if (event.type === 'item_added') return { ...prev, items: [...items, event.item] };
+                if (event.type === 'items_added') return { ...prev, items: [...items, ...event.items] };
                 if (event.type === 'item_updated') return { ...prev, items: items.map(i => i.id === event.item.id ? event.item : i) };
                 if (event.type === 'item_deleted') return { ...prev, items: items.filter(i => i.id !== event.item_id) };
                 if (event.type === 'item_reserved') return { ...prev, items: items.map(i => i.id === event.item_id ? { ...i, is_reserved: true } : i) };
@@ -53,7 +58,7 @@ export default function PublicWishlistScreen({ route, navigation }: any) {
                 if (event.type === 'contribution_added') return { ...prev, items: items.map(i => i.id === event.item_id ? { ...i, total_contributed: event.total_contributed, contributors_count: event.contributors_count } : i) };
                 return prev;
             });
-        }, []),
+        }, [slug]),
     });
 
     const isOwner = !!(user && wishlist && user.id === wishlist.user_id);
@@ -39,12 +39,19 @@ export default function WishlistDetailScreen({ route, navigation }: any) {
     useWebSocket({
         slug,
         onEvent: useCallback((event: WsEvent) => {
+            if (event.type === 'resync') {
+                wishlistApi.get(slug).then(res => setWishlist(res.data)).catch(() => {});
+                return;
+            }
             setWishlist(prev => {
                 if (!prev) return prev;
                 const items = [...prev.items];
                 if (event.type === 'item_added') {
                     return { ...prev, items: [...items, event.item] };
                 }
+                if (event.type === 'items_added') {
+                    return { ...prev, items: [...items, ...event.items] };
+                }
                 if (event.type === 'item_updated') {
                     return { ...prev, items: items.map(i => i.id === event.item.id ? event.item : i) };
                 }
@@ -68,7 +75,7 @@ export default function WishlistDetailScreen({ route, navigation }: any) {
                 }
                 return prev;
             });
-        }, []),
+        }, [slug]),
     });
 
     const handleDelete = async (item: ItemOut) => {